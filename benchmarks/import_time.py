@@ -0,0 +1,59 @@
+"""
+Benchmark the cold start time of the library (the time taken to start a
+Python process and import/use parts of it, less the time taken to start an
+empty Python process).
+
+    python benchmarks/import_time.py
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = [
+    ('import h51', 'import h51'),
+    ('create a client', 'import h51; h51.Client("key")'),
+    ('import resources', 'import h51; h51.resources; h51.transforms'),
+    ('load HTTP backend', 'import h51; h51.Client("key").session')
+]
+
+
+def cold_start(code, runs):
+    """Return the fastest time (in seconds) to run the code in a new process"""
+
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable, '-c', code],
+            cwd=ROOT,
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        timings.append(time.perf_counter() - started)
+
+    return min(timings)
+
+
+def main(runs=20):
+
+    baseline = cold_start('pass', runs)
+    print(f'python startup: {baseline * 1000:.1f}ms')
+
+    for label, code in SCENARIOS:
+        try:
+            timing = cold_start(code, runs) - baseline
+
+        except subprocess.CalledProcessError:
+            print(f'{label}: failed (missing dependencies?)')
+            continue
+
+        print(f'{label}: +{timing * 1000:.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
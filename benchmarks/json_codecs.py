@@ -0,0 +1,86 @@
+"""
+Benchmark the JSON codecs against a page of 100 asset results (as returned
+by `Asset.many`) and a `local=True` variations payload for 100 assets.
+
+    python benchmarks/json_codecs.py
+"""
+
+import json
+import timeit
+
+from h51 import codecs
+
+
+def asset_document(i):
+    return {
+        'uid': f'{i:06x}',
+        'name': f'image-{i}',
+        'ext': 'jpg',
+        'type': 'image',
+        'content_type': 'image/jpeg',
+        'secure': False,
+        'expires': None,
+        'created': '2020-01-01T12:00:00.000000',
+        'modified': '2020-01-02T12:00:00.000000',
+        'meta': {
+            'filename': f'image-{i}.jpg',
+            'length': 1024 * 1024,
+            'image': {'mode': 'RGB', 'size': [4000, 3000], 'format': 'JPEG'},
+            'dominant_colors': [[[12, 34, 56], 0.5], [[200, 100, 50], 0.5]],
+            'focal_point': [0.25, 0.25, 0.75, 0.75]
+        },
+        'variations': {
+            name: {
+                'name': name,
+                'ext': 'webp',
+                'meta': {'length': 65536, 'image': {'size': [640, 480]}},
+                'store_key': f'{i:06x}.{name}.webp',
+                'version': 1
+            }
+            for name in ['x1', 'x2', 'thumb']
+        }
+    }
+
+
+def main():
+
+    page = json.dumps({
+        'results': [asset_document(i) for i in range(100)],
+        'result_count': 100000,
+        'has_more': True,
+        'url': 'https://api.h51.io/assets'
+    }).encode('utf-8')
+
+    variations = {
+        f'{i:06x}': {
+            name: [
+                ['auto_orient', {}],
+                ['focal_point_crop', {'aspect_ratio': 0.5}],
+                ['fit', {'width': 640, 'height': 640}],
+                ['output', {'image_format': 'WebP'}]
+            ]
+            for name in ['x1', 'x2', 'thumb']
+        }
+        for i in range(100)
+    }
+
+    available = [codecs.JSONCodec()]
+    for codec_cls in [codecs.OrjsonCodec, codecs.MsgspecCodec]:
+        try:
+            available.append(codec_cls())
+        except ImportError:
+            print(f'{codec_cls.name}: not installed')
+
+    number = 200
+    for codec in available:
+        loads = timeit.timeit(lambda: codec.loads(page), number=number)
+        dumps = timeit.timeit(lambda: codec.dumps(variations), number=number)
+        print(
+            f'{codec.name}: '
+            f'loads {loads / number * 1000:.3f}ms/page, '
+            f'dumps {dumps / number * 1000:.3f}ms/payload'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,54 @@
-from .client import *
+import importlib
 
-from . import analyzers
-from . import exceptions
-from . import resources
-from . import transforms
+# The names exported by `from h51 import *` (as before submodules were loaded
+# lazily).
+__all__ = [
+    'Client',
+    'analyzers',
+    'client',
+    'exceptions',
+    'pagination',
+    'resources',
+    'transforms'
+]
+
+# NOTE: Submodules (and the HTTP backend used by the client) are loaded the
+# first time they are accessed, so importing the package is cheap for short
+# lived processes that only use part of it.
+
+_SUBMODULES = {
+    'analyzers',
+    'arrays',
+    'batching',
+    'client',
+    'codecs',
+    'concurrency',
+    'exceptions',
+    'fingerprints',
+    'geometry',
+    'hedging',
+    'mirror',
+    'pagination',
+    'pool',
+    'preprocess',
+    'replay',
+    'resources',
+    'scheduling',
+    'transforms'
+}
+
+
+def __getattr__(name):
+
+    if name == 'Client':
+        from .client import Client
+        return Client
+
+    if name in _SUBMODULES:
+        return importlib.import_module(f'.{name}', __name__)
+
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+
+def __dir__():
+    return sorted(set(globals()) | _SUBMODULES | {'Client'})
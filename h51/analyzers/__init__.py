@@ -16,6 +16,14 @@ class Analyzer:
         # The arguments for the analyzer
         self._args = {k: v for k, v in kwargs.items() if v is not None}
 
+    @property
+    def args(self):
+        return dict(self._args)
+
+    @property
+    def name(self):
+        return self._name
+
     def to_json_type(self):
         return [self._name, self._args]
 
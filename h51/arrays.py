@@ -0,0 +1,155 @@
+"""
+Decoding downloaded variations into NumPy arrays.
+
+NOTE: This module requires NumPy and Pillow (`pip install h51[arrays]`).
+"""
+
+from concurrent import futures
+import io
+import threading
+
+__all__ = [
+    'decode_array',
+    'download_array',
+    'download_arrays'
+]
+
+
+class _BufferReader(io.RawIOBase):
+    """
+    A read-only file-like view of a buffer (unlike `io.BytesIO` the buffer
+    is not copied).
+    """
+
+    def __init__(self, view):
+        self._view = view
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, b):
+        size = min(len(b), len(self._view) - self._position)
+        b[:size] = self._view[self._position:self._position + size]
+        self._position += size
+        return size
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+
+        self._position = max(0, offset)
+        return self._position
+
+    def tell(self):
+        return self._position
+
+
+def decode_array(data, mode='RGB'):
+    """
+    Decode an image (bytes or a buffer) into a NumPy array of shape
+    `(height, width, channels)` (or `(height, width)` for single channel
+    modes such as `'L'`).
+    """
+
+    import numpy
+    from PIL import Image
+
+    with Image.open(_BufferReader(memoryview(data))) as image:
+        if image.mode != mode:
+            image = image.convert(mode)
+
+        image.load()
+        return numpy.asarray(image)
+
+
+def download_array(variation, mode='RGB', buffer=None):
+    """
+    Download a variation and decode it into a NumPy array (see
+    `decode_array`).
+
+    The variation is downloaded directly into `buffer` (a `bytearray`) if
+    given, allowing the buffer to be reused between downloads, and decoded
+    from it without an intermediate copy.
+    """
+
+    with variation.download_into(buffer) as data:
+        return decode_array(data, mode=mode)
+
+
+def download_arrays(
+    variations,
+    shape=None,
+    mode='RGB',
+    dtype='uint8',
+    max_workers=8,
+    out=None
+):
+    """
+    Download and decode many variations concurrently into a single stacked
+    NumPy array of shape `(len(variations), *shape)`, e.g for feeding a batch
+    of images to a model.
+
+    The stacked array is allocated up front from `shape` (the shape of each
+    decoded image), or an existing array can be given as `out` to be filled.
+    If neither is given the shape is taken from the first variation. Each
+    worker thread reuses a single download buffer.
+    """
+
+    import numpy
+
+    variations = list(variations)
+    first = None
+
+    if out is None:
+        if shape is None:
+            if not variations:
+                raise ValueError('A shape is required if no variations given')
+
+            first = download_array(variations[0], mode=mode)
+            shape = first.shape
+
+        out = numpy.empty((len(variations), *shape), dtype=dtype)
+
+    elif len(out) < len(variations):
+        raise ValueError(
+            f'The output array holds {len(out)} images, '
+            f'{len(variations)} were given'
+        )
+
+    local = threading.local()
+
+    def fill(i):
+
+        if i == 0 and first is not None:
+            array = first
+
+        else:
+            if not hasattr(local, 'buffer'):
+                local.buffer = bytearray()
+
+            array = download_array(
+                variations[i],
+                mode=mode,
+                buffer=local.buffer
+            )
+
+        if array.shape != out.shape[1:]:
+            raise ValueError(
+                f'{variations[i]} has shape {array.shape}, '
+                f'expected {out.shape[1:]}'
+            )
+
+        out[i] = array
+
+    with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for _ in executor.map(fill, range(len(variations))):
+            pass
+
+    return out
@@ -0,0 +1,221 @@
+from concurrent.futures import Future
+from datetime import datetime
+import threading
+import time
+
+from . import resources
+
+__all__ = ['WriteCoalescer']
+
+
+class WriteCoalescer:
+    """
+    A queue that buffers per-asset `expire`, `persist` and `shallow_copy`
+    calls for a short window and flushes them as batched calls to
+    `Asset.expire_many`, `Asset.persist_many` and `Asset.shallow_copy_many`.
+
+    Calls are merged by operation and argument (e.g. all calls to expire
+    assets in 3600 seconds are flushed together). Repeated `expire` and
+    `persist` calls for an asset are flushed once, with only the last call
+    for the asset applied (calls it supersedes resolve with it), and
+    repeated `shallow_copy` calls have their copies added together.
+
+    Each call returns a `Future` that resolves to the asset's part of the
+    response if the API's response is keyed by uid (or is a list of asset
+    documents), otherwise to the response for the whole batch the call was
+    flushed in.
+    """
+
+    def __init__(self, client, window=0.05, max_batch_size=100):
+
+        # The API client used to flush batches
+        self._client = client
+
+        # The period of time (in seconds) to buffer calls for before they are
+        # flushed.
+        self._window = window
+
+        # The maximum number of uids flushed in a single call
+        self._max_batch_size = max_batch_size
+
+        # Pending batches (`{(operation, arg): batch}`)
+        self._batches = {}
+        self._condition = threading.Condition()
+        self._closed = False
+
+        # The thread that flushes batches once their window has elapsed
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Flush any pending calls and stop the coalescer"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+
+        self._thread.join()
+
+    def expire(self, uid, seconds):
+        """Queue a call to set an expires time for the asset"""
+
+        if isinstance(seconds, datetime):
+            seconds = round(seconds.timestamp() - time.time())
+
+        return self._add('expire', seconds, uid)
+
+    def flush(self):
+        """Flush all pending calls immediately"""
+        with self._condition:
+            batches = list(self._batches.items())
+            self._batches.clear()
+
+        for key, batch in batches:
+            self._flush_batch(key, batch)
+
+    def persist(self, uid):
+        """Queue a call to set the asset to persist"""
+        return self._add('persist', None, uid)
+
+    def shallow_copy(self, uid, copies=1):
+        """Queue a call to shallow copy the asset"""
+
+        # Shallow copies are batched regardless of the number of copies (the
+        # copies for each asset are totalled when the batch is flushed).
+        return self._add('shallow_copy', None, uid, copies)
+
+    def _add(self, operation, arg, uid, copies=None):
+
+        future = Future()
+
+        with self._condition:
+
+            if self._closed:
+                raise RuntimeError('Cannot queue calls after close')
+
+            # An expire/persist call supersedes any pending expire/persist
+            # call for the asset queued with a different argument (the last
+            # write wins), the superseded calls resolve with this call.
+            superseded = []
+            if operation in ['expire', 'persist']:
+                for key, pending in list(self._batches.items()):
+                    if key[0] in ['expire', 'persist'] \
+                            and key != (operation, arg) \
+                            and uid in pending['futures']:
+
+                        superseded.extend(pending['futures'].pop(uid))
+                        if not pending['futures']:
+                            del self._batches[key]
+
+            batch = self._batches.get((operation, arg))
+            if batch is None:
+                batch = self._batches[(operation, arg)] = {
+                    'deadline': time.monotonic() + self._window,
+                    'futures': {}
+                }
+                self._condition.notify()
+
+            calls = batch['futures'].setdefault(uid, [])
+            calls.extend(superseded)
+            calls.append((future, copies))
+
+        return future
+
+    def _flush_batch(self, key, batch):
+
+        operation, arg = key
+
+        # Group the uids by the argument they're flushed with (for shallow
+        # copies the total number of copies queued for the asset).
+        groups = {}
+        for uid, calls in batch['futures'].items():
+            if operation == 'shallow_copy':
+                arg = sum(copies for _, copies in calls)
+            groups.setdefault(arg, []).append(uid)
+
+        for arg, uids in groups.items():
+            for i in range(0, len(uids), self._max_batch_size):
+                chunk = uids[i:i + self._max_batch_size]
+                self._flush_chunk(operation, arg, chunk, batch['futures'])
+
+    def _flush_chunk(self, operation, arg, uids, calls):
+
+        try:
+            if operation == 'expire':
+                r = resources.Asset.expire_many(self._client, uids, arg)
+
+            elif operation == 'persist':
+                r = resources.Asset.persist_many(self._client, uids)
+
+            else:
+                r = resources.Asset.shallow_copy_many(
+                    self._client,
+                    uids,
+                    arg
+                )
+
+        except Exception as e:
+            for uid in uids:
+                for future, _ in calls[uid]:
+                    future.set_exception(e)
+
+        else:
+            for uid in uids:
+                result = _result_for_uid(r, uid)
+                for future, _ in calls[uid]:
+                    future.set_result(result)
+
+    def _run(self):
+
+        while True:
+
+            with self._condition:
+
+                # Wait for the earliest batch to become due
+                while True:
+                    now = time.monotonic()
+                    due = [
+                        k for k, b in self._batches.items()
+                        if b['deadline'] <= now or self._closed
+                    ]
+
+                    if due or (self._closed and not self._batches):
+                        break
+
+                    timeout = None
+                    if self._batches:
+                        timeout = min(
+                            b['deadline'] for b in self._batches.values()
+                        ) - now
+
+                    self._condition.wait(timeout)
+
+                if not due:
+                    return
+
+                batches = [(k, self._batches.pop(k)) for k in due]
+
+            for key, batch in batches:
+                self._flush_batch(key, batch)
+
+
+def _result_for_uid(r, uid):
+    """
+    Return the part of a batch response for an asset (or the whole response
+    if it isn't keyed by uid).
+    """
+
+    if isinstance(r, dict) and uid in r:
+        return r[uid]
+
+    if isinstance(r, list):
+        for document in r:
+            if isinstance(document, dict) and document.get('uid') == uid:
+                return document
+
+    return r
@@ -0,0 +1,594 @@
+"""
+The `h51` command line interface.
+
+    h51 ingest ./images --config recipes.json --workers 8
+    h51 replay h51.trace --speed 10 --rate-limit 10
+
+The config file is JSON and holds the analyzers and variations to apply to
+each uploaded asset, in the same form they are sent to the API:
+
+    {
+        "analyzers": [["dominant_colors", {}], ["focal_point", {}]],
+        "variations": {
+            "x1": [
+                ["auto_orient", {}],
+                ["fit", {"width": 640, "height": 640}],
+                ["output", {"image_format": "WebP"}]
+            ]
+        }
+    }
+"""
+
+import argparse
+from concurrent import futures
+import json
+import os
+import sys
+import threading
+import time
+
+from . import client as _client
+from . import concurrency
+from . import exceptions
+from . import preprocess
+from . import replay as _replay
+from . import resources
+from .analyzers import Analyzer
+from .transforms import Transform
+from .transforms import images as image_transforms
+
+__all__ = ['main']
+
+# The transform classes for each transform name (so that the geometry of
+# variations can be predicted, e.g to downscale images before uploading).
+TRANSFORMS = {
+    'auto_orient': image_transforms.AutoOrient,
+    'crop': image_transforms.Crop,
+    'fit': image_transforms.Fit,
+    'focal_point_crop': image_transforms.FocalPointCrop,
+    'output': image_transforms.Output,
+    'rotate': image_transforms.Rotate,
+    'single_frame': image_transforms.SingleFrame
+}
+
+
+def main(argv=None):
+    """Run the command line interface"""
+
+    parser = argparse.ArgumentParser(
+        prog='h51',
+        description='Command line tools for the H51 API.'
+    )
+    parser.add_argument(
+        '--api-key',
+        default=os.environ.get('H51_API_KEY'),
+        help='The API key to use (defaults to $H51_API_KEY)'
+    )
+    parser.add_argument(
+        '--api-base-url',
+        default=os.environ.get('H51_API_BASE_URL', 'https://api.h51.io'),
+        help='The base URL of the API'
+    )
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        default=None,
+        help='The timeout (in seconds) for requests to the API'
+    )
+
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    # Ingest
+    ingest_parser = commands.add_parser(
+        'ingest',
+        help='Upload a directory tree of files as assets'
+    )
+    ingest_parser.add_argument('directory')
+    ingest_parser.add_argument(
+        '--config',
+        help='A JSON file of analyzers and variations to apply to each asset'
+    )
+    ingest_parser.add_argument(
+        '--workers',
+        type=int,
+        default=4,
+        help='The number of files to upload concurrently'
+    )
+    ingest_parser.add_argument(
+        '--adaptive',
+        action='store_true',
+        help=(
+            'Adapt the number of concurrent uploads (up to --workers) to '
+            'the observed latency and rate limiting'
+        )
+    )
+    ingest_parser.add_argument(
+        '--journal',
+        default='h51-ingest.journal',
+        help='The journal of uploaded files (used to resume a run)'
+    )
+    ingest_parser.add_argument(
+        '--pattern',
+        action='append',
+        help='Only upload files with the given extension (e.g. .jpg)'
+    )
+    ingest_parser.add_argument(
+        '--downscale',
+        action='store_true',
+        help=(
+            'Downscale images to the largest size any of the variations '
+            'require before uploading them (requires Pillow)'
+        )
+    )
+    ingest_parser.add_argument(
+        '--downscale-headroom',
+        type=float,
+        default=1.0,
+        help='A multiplier applied to the size required by the variations'
+    )
+    ingest_parser.add_argument('--expire', type=int, default=None)
+    ingest_parser.add_argument('--secure', action='store_true')
+    ingest_parser.set_defaults(func=ingest)
+
+    # Replay
+    replay_parser = commands.add_parser(
+        'replay',
+        help='Replay a recorded trace against a local stand-in server'
+    )
+    replay_parser.add_argument('trace')
+    replay_parser.add_argument(
+        '--speed',
+        type=float,
+        default=1.0,
+        help='The speed-up to replay the trace at (e.g. 10 for 10x the load)'
+    )
+    replay_parser.add_argument(
+        '--workers',
+        type=int,
+        default=32,
+        help='The number of calls that can be made concurrently'
+    )
+    replay_parser.add_argument(
+        '--latency-scale',
+        type=float,
+        default=1.0,
+        help='A multiplier applied to the recorded latency of each call'
+    )
+    replay_parser.add_argument(
+        '--rate-limit',
+        type=int,
+        default=None,
+        help='The number of requests per second the stand-in server allows'
+    )
+    replay_parser.add_argument(
+        '--adaptive',
+        action='store_true',
+        help='Adapt the number of concurrent calls (up to --workers)'
+    )
+    replay_parser.add_argument(
+        '--json',
+        action='store_true',
+        help='Output the report as JSON'
+    )
+    replay_parser.set_defaults(func=replay)
+
+    args = parser.parse_args(argv)
+
+    if args.command != 'replay' and not args.api_key:
+        parser.error('an API key is required (--api-key or $H51_API_KEY)')
+
+    return args.func(args)
+
+
+# Commands
+
+def ingest(args):
+    """Upload a directory tree of files as assets"""
+
+    limiter = None
+    if args.adaptive:
+        limiter = concurrency.AdaptiveLimiter(
+            initial=min(4, args.workers),
+            max_limit=args.workers,
+            latency_tolerance=4.0
+        )
+
+    client = _client.Client(
+        args.api_key,
+        api_base_url=args.api_base_url,
+        timeout=args.timeout,
+        concurrency=limiter
+    )
+
+    # Load the recipes
+    analyzers = []
+    variations = {}
+    if args.config:
+        with open(args.config) as f:
+            config = json.load(f)
+
+        analyzers = [
+            Analyzer(name, **(a_args or {}))
+            for name, a_args in config.get('analyzers', [])
+        ]
+        variations = {
+            variation_name: [
+                _transform(name, t_args or {}) for name, t_args in recipe
+            ]
+            for variation_name, recipe in config.get('variations', {}).items()
+        }
+
+    journal = Journal(args.journal)
+    progress = Progress(limiter=limiter)
+    extensions = tuple(p.lower() for p in args.pattern or [])
+
+    # Images are downscaled in a pool of processes
+    downscaler = None
+    if args.downscale and variations:
+        downscaler = futures.ProcessPoolExecutor()
+
+    def upload(path, rel_path):
+
+        # Resume from the last step journalled for the file (if any)
+        uid = journal.uid(rel_path)
+        status = journal.status(rel_path)
+        asset = None
+
+        if uid is None:
+            asset = create(path, rel_path)
+            uid = asset.uid
+            status = 'created'
+            journal.record(rel_path, uid, status)
+
+        elif analyzers or variations:
+            # Apply the remaining recipes to the asset already uploaded
+            asset = _retry(lambda: resources.Asset.one(client, uid), client)
+
+        if analyzers and status == 'created':
+            _retry(lambda: asset.analyze(analyzers), client)
+            status = 'analyzed'
+            journal.record(rel_path, uid, status)
+
+        if variations:
+            _retry(
+                lambda: resources.Variation.create(asset, variations),
+                client
+            )
+
+        return uid
+
+    def create(path, rel_path):
+
+        upload_path = path
+        if downscaler:
+            try:
+                upload_path = downscaler.submit(
+                    preprocess.downscale_file,
+                    path,
+                    variations,
+                    headroom=args.downscale_headroom
+                ).result()
+
+            except Exception:
+                # Not an image Pillow can downscale, upload the original
+                upload_path = path
+
+        try:
+            with open(upload_path, 'rb') as f:
+                asset = _retry(
+                    lambda: resources.Asset.create(
+                        client,
+                        (os.path.basename(rel_path), f),
+                        name=rel_path,
+                        expire=args.expire,
+                        secure=args.secure
+                    ),
+                    client,
+                    rewind=f
+                )
+
+        finally:
+            if upload_path != path:
+                os.remove(upload_path)
+
+        return asset
+
+    def on_done(rel_path, size, future):
+        try:
+            uid = future.result()
+
+        except Exception as e:
+            progress.failed()
+            progress.write(f'Failed: {rel_path}: {e}'.replace('\n', ' '))
+
+        else:
+            journal.record(rel_path, uid, 'completed')
+            progress.completed(size)
+
+    # Upload the files (keeping the number of queued uploads bounded)
+    with futures.ThreadPoolExecutor(max_workers=args.workers) as executor:
+        pending = set()
+        for path, rel_path in _walk(args.directory, extensions):
+
+            if rel_path in journal:
+                progress.skipped()
+                continue
+
+            if len(pending) >= args.workers * 2:
+                done, pending = futures.wait(
+                    pending,
+                    return_when=futures.FIRST_COMPLETED
+                )
+
+            size = os.path.getsize(path)
+            future = executor.submit(upload, path, rel_path)
+            future.add_done_callback(
+                lambda f, r=rel_path, s=size: on_done(r, s, f)
+            )
+            pending.add(future)
+            progress.report()
+
+        futures.wait(pending)
+
+    if downscaler:
+        downscaler.shutdown()
+
+    journal.close()
+    progress.report(final=True)
+
+    return 1 if progress.failures else 0
+
+
+def replay(args):
+    """Replay a recorded trace against a local stand-in server"""
+
+    events = _replay.read_trace(args.trace)
+
+    limiter = None
+    if args.adaptive:
+        limiter = concurrency.AdaptiveLimiter(
+            initial=min(4, args.workers),
+            max_limit=args.workers
+        )
+
+    with _replay.StandInServer(rate_limit=args.rate_limit) as server:
+        client = _client.Client(
+            'replay',
+            api_base_url=server.url,
+            timeout=args.timeout,
+            concurrency=limiter
+        )
+        report = _replay.replay(
+            events,
+            client,
+            speed=args.speed,
+            workers=args.workers,
+            latency_scale=args.latency_scale
+        )
+
+    if args.json:
+        print(json.dumps(report, indent=4))
+        return 0
+
+    def ms(seconds):
+        return f'{seconds * 1000:.1f}ms' if seconds is not None else '-'
+
+    latency = report['latency']
+    print(
+        f"{report['requests']} requests in {report['duration']:.2f}s "
+        f"({report['throughput']:.1f} requests/s)\n"
+        f"latency p50 {ms(latency['p50'])}, p90 {ms(latency['p90'])}, "
+        f"p99 {ms(latency['p99'])}, max {ms(report['max_latency'])}\n"
+        f"max lag {ms(report['max_lag'])}\n"
+        f"{report['throttled']} throttled "
+        f"({report['throttled_rate'] * 100:.1f}%), "
+        f"{report['errors']} errors\n"
+        f"client CPU {report['cpu_time']:.2f}s "
+        f"({report['cpu_utilization'] * 100:.1f}%)"
+        + (
+            f", peak memory {report['max_rss'] / 1024 / 1024:.1f}MB"
+            if report['max_rss'] is not None else ''
+        )
+    )
+
+    return 0
+
+
+# Utils
+
+class Journal:
+    """
+    An append-only journal of the files that have been uploaded (and the uid
+    of the asset created for each).
+
+    Each file is journalled once its asset is created, once it's analyzed
+    and once all its recipes have been applied, so an interrupted run
+    resumes files from the last step completed rather than uploading them
+    again.
+    """
+
+    def __init__(self, path):
+
+        # The uid and status of the asset for each file journalled
+        self._entries = {}
+
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self._entries[entry['path']] = (
+                            entry['uid'],
+                            entry.get('status', 'completed')
+                        )
+
+                    except (ValueError, KeyError):
+                        # Ignore a partially written line
+                        pass
+
+        # Terminate a partially written final line so the next entry isn't
+        # appended to it.
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, 'rb+') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    f.write(b'\n')
+
+        self._lock = threading.Lock()
+        self._file = open(path, 'a')
+
+    def __contains__(self, rel_path):
+        return self.status(rel_path) == 'completed'
+
+    def close(self):
+        self._file.close()
+
+    def record(self, rel_path, uid, status):
+        with self._lock:
+            self._entries[rel_path] = (uid, status)
+            self._file.write(
+                json.dumps(
+                    {'path': rel_path, 'uid': uid, 'status': status}
+                ) + '\n'
+            )
+            self._file.flush()
+
+    def status(self, rel_path):
+        """
+        Return the status (`'created'`, `'analyzed'` or `'completed'`) of
+        the asset for a file, or `None` if it's not been uploaded.
+        """
+        return self._entries.get(rel_path, (None, None))[1]
+
+    def uid(self, rel_path):
+        """Return the uid of the asset uploaded for a file (if any)"""
+        return self._entries.get(rel_path, (None, None))[0]
+
+
+class Progress:
+    """
+    Progress and throughput stats streamed to the terminal (stderr).
+    """
+
+    def __init__(self, interval=1.0, stream=None, limiter=None):
+
+        # The minimum period (in seconds) between reports
+        self._interval = interval
+
+        # The concurrency limiter used for uploads (if adaptive)
+        self._limiter = limiter
+
+        # The stream reports are written to
+        self._stream = stream or sys.stderr
+
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._reported = 0
+        self._completed = 0
+        self._bytes = 0
+        self._skipped = 0
+        self._failed = 0
+
+    @property
+    def failures(self):
+        return self._failed
+
+    def completed(self, size):
+        with self._lock:
+            self._completed += 1
+            self._bytes += size
+        self.report()
+
+    def failed(self):
+        with self._lock:
+            self._failed += 1
+        self.report()
+
+    def report(self, final=False):
+        with self._lock:
+            now = time.monotonic()
+            if not final and now - self._reported < self._interval:
+                return
+
+            self._reported = now
+            elapsed = max(now - self._started, 1e-6)
+            self._stream.write(
+                f'\r{self._completed} uploaded, '
+                f'{self._skipped} skipped, '
+                f'{self._failed} failed | '
+                f'{self._completed / elapsed:.1f} files/s, '
+                f'{self._bytes / elapsed / 1024 / 1024:.2f} MB/s'
+                + (
+                    f', concurrency {self._limiter.limit}'
+                    if self._limiter else ''
+                )
+                + ('\n' if final else '')
+            )
+            self._stream.flush()
+
+    def skipped(self):
+        with self._lock:
+            self._skipped += 1
+
+    def write(self, message):
+        with self._lock:
+            self._stream.write('\n' + message + '\n')
+            self._stream.flush()
+
+
+def _retry(func, client, attempts=5, rewind=None):
+    """
+    Call a function, retrying if the request limit is exceeded (after
+    waiting for the rate limit to reset).
+    """
+
+    for attempt in range(attempts):
+        try:
+            return func()
+
+        except exceptions.H51RequestLimitExceeded:
+            if attempt == attempts - 1:
+                raise
+
+            reset = client.rate_limit_reset or time.time() + 1
+            time.sleep(max(0.1, reset - time.time()))
+
+            if rewind is not None:
+                rewind.seek(0)
+
+
+def _transform(name, args):
+    """Return a transform for a name and arguments from a config file"""
+
+    if name in TRANSFORMS:
+        try:
+            return TRANSFORMS[name](**args)
+
+        except TypeError:
+            # Arguments the class doesn't support, send the transform as is
+            pass
+
+    return Transform(name, **args)
+
+
+def _walk(directory, extensions):
+    """
+    Yield the path and relative path of each file in a directory tree (in a
+    stable order so that interrupted runs resume consistently).
+    """
+
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for filename in sorted(files):
+
+            if extensions and not filename.lower().endswith(extensions):
+                continue
+
+            path = os.path.join(root, filename)
+            rel_path = os.path.relpath(path, directory).replace(os.sep, '/')
+            yield path, rel_path
+
+
+if __name__ == '__main__':
+    sys.exit(main())
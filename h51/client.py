@@ -1,12 +1,40 @@
+import base64
+from concurrent import futures
+import contextlib
+import contextvars
+import functools
+import gzip
+import hashlib
 import io
-import json
-
-import requests
-
+import itertools
+import math
+import mmap
+import os
+import threading
+import time
+import urllib.parse
+import weakref
+
+from . import codecs
 from . import exceptions
+from . import scheduling
 
 __all__ = ['Client']
 
+# The size of the chunks (in bytes) that downloads are streamed in
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# The clients shared within each process by unpickled resources (see
+# `Client.__reduce__`), keyed by process Id and connection settings.
+_clients = {}
+_clients_lock = threading.Lock()
+
+# The clients that have been pickled (keyed by process Id and handle), so
+# that unpickling within the same process returns the original client. The
+# clients are weakly referenced so that pickling doesn't keep them alive.
+_pickled_clients = weakref.WeakValueDictionary()
+_handles = itertools.count()
+
 
 class Client:
     """
@@ -17,7 +45,15 @@ class Client:
         self,
         api_key,
         api_base_url='https://api.h51.io',
-        timeout=None
+        timeout=None,
+        json_codec=None,
+        compress_requests=False,
+        compress_min_size=1024,
+        single_flight=False,
+        scheduler=None,
+        concurrency=None,
+        hedging=None,
+        recorder=None
     ):
 
         # A key used to authenticate API calls to an account
@@ -29,6 +65,66 @@ class Client:
         # The period of time before requests to the API should timeout
         self._timeout = timeout
 
+        # The codec used to encode/decode JSON (defaults to the fastest codec
+        # available).
+        self._json_codec = json_codec or codecs.get_default_codec()
+
+        # A flag indicating if request bodies (excluding file uploads) should
+        # be gzip compressed, and the minimum size (in bytes) of body that
+        # will be compressed.
+        self._compress_requests = compress_requests
+        self._compress_min_size = compress_min_size
+
+        # The session used to make requests (pooling connections to the API),
+        # the session (and HTTP backend) is loaded when first required.
+        self._session = None
+        self._session_lock = threading.Lock()
+
+        # A flag indicating if concurrent identical GET requests should be
+        # collapsed into a single request (the response is shared between
+        # the callers), and the requests currently in flight.
+        #
+        # NOTE: A caller that joins a request already in flight may receive
+        # a response sent before its own write completed (e.g. `expire`
+        # followed by `Asset.one`), so single flight is opt-in for callers
+        # that don't need to read their own writes.
+        self._single_flight = single_flight
+        self._flights = {}
+        self._flights_lock = threading.Lock()
+
+        # A scheduler used to share the rate limit between requests of
+        # different priorities (see `h51.scheduling.Scheduler`).
+        self._scheduler = scheduler
+
+        # A controller used to limit the number of requests in flight (see
+        # `h51.concurrency.AdaptiveLimiter`).
+        self._concurrency = concurrency
+
+        # A policy for hedging GET requests (see `h51.hedging.HedgePolicy`),
+        # hedged requests are sent from a thread pool created when first
+        # required.
+        self._hedging = hedging
+        self._hedge_executor = None
+        self._hedge_lock = threading.Lock()
+
+        # A recorder that calls to the API are traced to (see
+        # `h51.replay.TraceRecorder`).
+        self._recorder = recorder
+
+        # The handle the client is pickled with (see `__reduce__`), assigned
+        # when the client is first pickled.
+        self._handle = None
+
+        # Counters for the number of bytes transferred
+        self._transfer_lock = threading.Lock()
+        self._transfer_stats = {
+            'requests': 0,
+            'request_bytes': 0,
+            'request_bytes_sent': 0,
+            'response_bytes': 0,
+            'response_bytes_received': 0
+        }
+
         # NOTE: Rate limiting information is only available after a request
         # has been made.
 
@@ -44,6 +140,18 @@ class Client:
         # next reset.
         self._rate_limit_remaining = None
 
+    @property
+    def concurrency(self):
+        return self._concurrency
+
+    @property
+    def hedging(self):
+        return self._hedging
+
+    @property
+    def json_codec(self):
+        return self._json_codec
+
     @property
     def rate_limit(self):
         return self._rate_limit
@@ -56,6 +164,49 @@ class Client:
     def rate_limit_remaining(self):
         return self._rate_limit_remaining
 
+    @property
+    def recorder(self):
+        return self._recorder
+
+    @property
+    def scheduler(self):
+        return self._scheduler
+
+    @property
+    def session(self):
+        """The session used to make requests to the API"""
+
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    from urllib3.util.request import ACCEPT_ENCODING
+
+                    session = requests.Session()
+
+                    # Accept any content encoding the backend can decode
+                    session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+
+                    self._session = session
+
+        return self._session
+
+    @property
+    def transfer_stats(self):
+        """
+        Return the number of bytes transferred before and after compression
+        (excluding file uploads) and the total number of bytes saved.
+        """
+
+        with self._transfer_lock:
+            stats = dict(self._transfer_stats)
+
+        stats['bytes_saved'] = \
+                stats['request_bytes'] - stats['request_bytes_sent'] \
+                + stats['response_bytes'] - stats['response_bytes_received']
+
+        return stats
+
     def __call__(self,
         method,
         path,
@@ -80,23 +231,74 @@ class Client:
             # Filter out data set to `None`
             data = {k: v for k, v in data.items() if v is not None}
 
+        # Encode the request body
+        body = data
+        request_bytes = request_bytes_sent = 0
+
+        if data and not files:
+            body = urllib.parse.urlencode(data, doseq=True).encode('utf-8')
+            request_bytes = request_bytes_sent = len(body)
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+
+            if self._compress_requests \
+                    and len(body) >= self._compress_min_size:
+
+                body = gzip.compress(body)
+                request_bytes_sent = len(body)
+                headers['Content-Encoding'] = 'gzip'
+
         # Make the request
-        r = getattr(requests, method.lower())(
-            f'{self._api_base_url}/{path}',
-            headers=headers,
-            params=params,
-            data=data,
-            files=files,
-            timeout=self._timeout
+        send = functools.partial(
+            self._send,
+            method,
+            path,
+            headers,
+            params,
+            body,
+            files,
+            request_bytes,
+            request_bytes_sent,
+
+            # The latency of uploads and downloads depends on the size of the
+            # body and so isn't a useful signal for the concurrency limiter.
+            measure_latency=not (files or download)
         )
 
-        # Update the rate limit
-        if 'X-H51-RateLimit-Limit' in r.headers:
-            self._rate_limit = int(r.headers['X-H51-RateLimit-Limit'])
-            self._rate_limit_reset \
-                    = float(r.headers['X-H51-RateLimit-Reset'])
-            self._rate_limit_remaining \
-                    = int(r.headers['X-H51-RateLimit-Remaining'])
+        if self._hedging and method.lower() == 'get' and not files \
+                and (not download or self._hedging.hedge_downloads):
+
+            send = functools.partial(
+                self._send_hedged,
+                send,
+                download=download
+            )
+
+        event = None
+        if self._recorder is not None:
+            event = self._recorder.begin(
+                method,
+                path,
+                request_bytes,
+                download=download,
+                files=files
+            )
+
+        r = None
+        try:
+            if self._single_flight and method.lower() == 'get' \
+                    and not files:
+
+                r = self._send_single_flight(
+                    (path, repr(sorted((params or {}).items())), download),
+                    send
+                )
+
+            else:
+                r = send()
+
+        finally:
+            if event is not None:
+                self._recorder.end(event, r)
 
         # Handle a successful response
         if r.status_code in [200, 204]:
@@ -107,13 +309,342 @@ class Client:
             if r.headers.get('Content-Type', '')\
                     .startswith('application/json'):
 
-                return r.json()
+                return self._json_codec.loads(r.content)
 
             return None
 
-        # Raise an error related to the response
+        self._raise_for_response(r)
+
+    def __reduce__(self):
+        """
+        Pickle the client as a handle (its API key, base URL and timeout)
+        that unpickles to the original client within the same process, and
+        to a client shared by the receiving process otherwise (e.g a
+        `ProcessPoolExecutor` worker).
+
+        NOTE: Other settings (such as a scheduler or concurrency limiter) are
+        local to the process and are not pickled, and as the API key is
+        pickled the pickle should be treated as a secret.
+        """
+        with _clients_lock:
+            if self._handle is None:
+                self._handle = (os.getpid(), next(_handles))
+                _pickled_clients[self._handle] = self
+
+        return (
+            _get_client,
+            (self._handle, self._api_key, self._api_base_url, self._timeout)
+        )
+
+    async def acall(self, *args, **kwargs):
+        """
+        Call the API from a coroutine (the request is made in the event
+        loop's default executor).
+        """
+        import asyncio
+
+        # Run the call within a copy of the current context so that the
+        # priority set by the caller is kept.
+        context = contextvars.copy_context()
+
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            None,
+            functools.partial(context.run, self, *args, **kwargs)
+        )
+
+    def download_into(self, path, buffer=None):
+        """
+        Download the body for the given API path into a buffer and return a
+        memoryview of the bytes downloaded.
+
+        The body is read from the connection directly into the buffer. If a
+        `bytearray` buffer is given it is reused (and grown if the body is
+        larger than it), allowing callers that download many bodies to avoid
+        allocating a new buffer for each. The memoryview returned must be
+        released before the buffer is reused.
+        """
+
+        if buffer is None:
+            buffer = bytearray()
+
+        with self._scheduled(measure_latency=False) as request:
+            r = self.session.get(
+                f'{self._api_base_url}/{path}',
+                headers={
+                    'X-H51-APIKey': self._api_key,
+                    'Accept-Encoding': 'identity'
+                },
+                stream=True,
+                timeout=self._timeout
+            )
+            self._update_rate_limit(r, request)
+
+            if r.status_code != 200:
+                self._raise_for_response(r)
+
+            size = 0
+
+            if 'Content-Encoding' in r.headers:
+
+                # The server ignored the request for an unencoded body, the
+                # body has to be decoded a chunk at a time.
+                for chunk in r.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    buffer[size:size + len(chunk)] = chunk
+                    size += len(chunk)
+
+            else:
+                expected = int(r.headers.get('Content-Length') or 0)
+                if len(buffer) < expected:
+                    buffer.extend(bytes(expected - len(buffer)))
+
+                while not expected or size < expected:
+                    if size == len(buffer):
+                        buffer.extend(
+                            bytes(max(DOWNLOAD_CHUNK_SIZE, len(buffer)))
+                        )
+
+                    with memoryview(buffer)[size:] as view:
+                        read = r.raw.readinto(view)
+
+                    if not read:
+                        break
+
+                    size += read
+
+                if size < expected:
+                    raise IOError('Incomplete download')
+
+        self._count_download(size)
+
+        return memoryview(buffer)[:size]
+
+    def download_to(
+        self,
+        path,
+        file_path,
+        segments=4,
+        min_segment_size=8 * 1024 * 1024
+    ):
+        """
+        Download the body for the given API path to a file and return the
+        number of bytes written.
+
+        If the server supports range requests then large bodies are split
+        into (up to `segments`) byte ranges that are fetched over separate
+        pooled connections in parallel and written directly into a memory
+        mapped output file.
+
+        The size of the file is verified against the size reported by the
+        server, as is its digest if the server provides one (`Repr-Digest`
+        or `Digest` headers).
+        """
+
+        # Request the body unencoded so that its size (and byte offsets)
+        # match the file.
+        headers = {
+            'X-H51-APIKey': self._api_key,
+            'Accept-Encoding': 'identity'
+        }
+
+        # Request the first byte to find the size of the body and whether
+        # the server supports range requests.
+        with self._scheduled(measure_latency=False) as request:
+            r = self.session.get(
+                f'{self._api_base_url}/{path}',
+                headers=dict(headers, Range='bytes=0-0'),
+                stream=True,
+                timeout=self._timeout
+            )
+            self._update_rate_limit(r, request)
+
+            if r.status_code == 200:
+
+                # Ranges are not supported, download the body sequentially
+                digest = _get_digest(r.headers)
+                size = 0
+                with open(file_path, 'wb') as f:
+                    for chunk in r.iter_content(DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+                        size += len(chunk)
+                        if digest:
+                            digest[0].update(chunk)
+
+                self._count_download(size)
+
+                expected = None
+                if 'Content-Encoding' not in r.headers:
+                    expected = r.headers.get('Content-Length')
+
+                _verify_download(
+                    size,
+                    int(expected) if expected else None,
+                    digest
+                )
+                return size
+
+        if r.status_code != 206:
+            self._raise_for_response(r)
+
+        r.close()
+
+        # Split the body into segments
+        size = int(r.headers['Content-Range'].rsplit('/', 1)[1])
+        segment_count = max(
+            1,
+            min(segments, math.ceil(size / min_segment_size))
+        )
+        segment_size = math.ceil(size / segment_count) or 1
+        ranges = [
+            (start, min(start + segment_size, size) - 1)
+            for start in range(0, size, segment_size)
+        ]
+
+        # Requests for ranges must be for the same version of the body (a
+        # weak ETag can't be used as a validator for ranges).
+        validator = r.headers.get('ETag')
+        if not validator or validator.startswith('W/'):
+            validator = r.headers.get('Last-Modified')
+
+        if validator:
+            headers['If-Range'] = validator
+
+        digest = _get_digest(r.headers)
+        written = 0
+
+        with open(file_path, 'wb+') as f:
+            f.truncate(size)
+
+            if size > 0:
+                with mmap.mmap(f.fileno(), size) as buffer:
+
+                    with futures.ThreadPoolExecutor(len(ranges)) as executor:
+                        for range_written in executor.map(
+                            lambda byte_range: self._download_range(
+                                r.url,
+                                headers,
+                                buffer,
+                                *byte_range
+                            ),
+                            ranges
+                        ):
+                            self._count_download(range_written)
+                            written += range_written
+
+                    buffer.flush()
+
+                    if digest:
+                        digest[0].update(buffer)
+
+        _verify_download(written, size, digest)
+
+        return size
+
+    def priority(self, name):
+        """
+        Return a context manager that sets the priority of requests made
+        within it (`'high'`, `'normal'` or `'low'`), e.g:
+
+            with client.priority('low'):
+                h51.resources.Variation.create_many(client, ...)
+        """
+        return scheduling.priority(name)
+
+    def warm(self, connections=1, background=False):
+        """
+        Load the HTTP backend and open connections to the API ahead of the
+        first call (if `background` is true the connections are opened in a
+        background thread and the thread is returned).
+        """
+
+        session = self.session
+
+        def open_connection():
+            try:
+                session.head(self._api_base_url, timeout=self._timeout)
+
+            except Exception:
+                # Warming is a best effort, errors surface on the first call
+                pass
+
+        def open_connections():
+            threads = [
+                threading.Thread(target=open_connection)
+                for _ in range(connections)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        if background:
+            thread = threading.Thread(target=open_connections, daemon=True)
+            thread.start()
+            return thread
+
+        open_connections()
+
+    def _count_download(self, size):
+        with self._transfer_lock:
+            self._transfer_stats['requests'] += 1
+            self._transfer_stats['response_bytes'] += size
+            self._transfer_stats['response_bytes_received'] += size
+
+    def _download_range(self, url, headers, buffer, start, end, attempts=3):
+        """
+        Download a byte range of a body into a buffer (resuming from the last
+        byte received if the connection fails), and return the number of
+        bytes written.
+        """
+
+        offset = start
+        changed = False
+        for attempt in range(attempts):
+            try:
+                with self._scheduled(measure_latency=False) as request:
+                    r = self.session.get(
+                        url,
+                        headers=dict(headers, Range=f'bytes={offset}-{end}'),
+                        stream=True,
+                        timeout=self._timeout
+                    )
+                    self._update_rate_limit(r, request)
+
+                    if r.status_code == 200:
+                        # The body has changed (retrying won't help)
+                        r.close()
+                        changed = True
+                        break
+
+                    if r.status_code != 206:
+                        self._raise_for_response(r)
+
+                    for chunk in r.iter_content(DOWNLOAD_CHUNK_SIZE):
+                        if offset + len(chunk) > end + 1:
+                            raise IOError(
+                                'Received more bytes than requested'
+                            )
+
+                        buffer[offset:offset + len(chunk)] = chunk
+                        offset += len(chunk)
+
+                if offset == end + 1:
+                    return end + 1 - start
+
+            except OSError:
+                if attempt == attempts - 1:
+                    raise
+
+        if changed:
+            raise IOError('The body changed during the download')
+
+        raise IOError(f'Incomplete download of bytes {start}-{end}')
+
+    def _raise_for_response(self, r):
+        """Raise an error related to the response"""
+
         try:
-            error = r.json()
+            error = self._json_codec.loads(r.content)
 
         except ValueError:
             error = {}
@@ -127,3 +658,293 @@ class Client:
             error.get('hint'),
             error.get('arg_errors')
         )
+
+    @contextlib.contextmanager
+    def _scheduled(self, measure_latency=True):
+        """
+        Wait for the concurrency limiter and scheduler (if the client has
+        them) to grant a request, and release it once the request completes.
+
+        The context yields a dictionary that the outcome of the request is
+        recorded in (see `_update_rate_limit`).
+        """
+
+        with contextlib.ExitStack() as stack:
+
+            # The scheduler grants requests first so that requests are
+            # ordered by priority before they take a slot from the limiter,
+            # and the limiter's latency doesn't include time spent queued in
+            # the scheduler.
+            if self._scheduler is not None:
+                self._scheduler.acquire(scheduling.current_priority())
+                stack.callback(self._scheduler.release)
+
+            request = {'status_code': None, 'rate_limit_remaining': None}
+            if self._concurrency is not None:
+                request = stack.enter_context(
+                    self._concurrency.slot(measure_latency=measure_latency)
+                )
+
+            yield request
+
+    def _send(
+        self,
+        method,
+        path,
+        headers,
+        params,
+        body,
+        files,
+        request_bytes,
+        request_bytes_sent,
+        measure_latency=True
+    ):
+        """Send a request to the API and return the response"""
+
+        with self._scheduled(measure_latency=measure_latency) as request:
+            r = self.session.request(
+                method.upper(),
+                f'{self._api_base_url}/{path}',
+                headers=headers,
+                params=params,
+                data=body,
+                files=files,
+                timeout=self._timeout
+            )
+            response_bytes = len(r.content)
+            self._update_rate_limit(r, request)
+
+        # Update the transfer stats
+        try:
+            response_bytes_received = r.raw.tell() or response_bytes
+
+        except AttributeError:
+            response_bytes_received = response_bytes
+
+        with self._transfer_lock:
+            self._transfer_stats['requests'] += 1
+            self._transfer_stats['request_bytes'] += request_bytes
+            self._transfer_stats['request_bytes_sent'] += request_bytes_sent
+            self._transfer_stats['response_bytes'] += response_bytes
+            self._transfer_stats['response_bytes_received'] \
+                    += response_bytes_received
+
+        return r
+
+    def _send_hedged(self, send, download=False):
+        """
+        Send a request, sending a duplicate (hedged) request if it hasn't
+        answered within the hedge delay and returning whichever response
+        arrives first.
+        """
+
+        hedging = self._hedging
+
+        def timed_send():
+            started = time.monotonic()
+            r = send()
+            hedging.record(time.monotonic() - started, download=download)
+            return r
+
+        delay = hedging.delay(download=download)
+        if delay is None:
+            return timed_send()
+
+        if self._hedge_executor is None:
+            with self._hedge_lock:
+                if self._hedge_executor is None:
+                    self._hedge_executor = futures.ThreadPoolExecutor(
+                        thread_name_prefix='h51-hedge'
+                    )
+
+        # Requests are sent within a copy of the current context so that the
+        # caller's priority is kept.
+        primary = self._hedge_executor.submit(
+            contextvars.copy_context().run,
+            timed_send
+        )
+
+        done, _ = futures.wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        hedge = self._hedge_executor.submit(
+            contextvars.copy_context().run,
+            timed_send
+        )
+
+        # Use the first successful response (if every request fails the
+        # primary request's error is raised).
+        pending = {primary, hedge}
+        winner = None
+        while pending and winner is None:
+            done, pending = futures.wait(
+                pending,
+                return_when=futures.FIRST_COMPLETED
+            )
+
+            for future in done:
+                if future.exception() is None:
+                    winner = future
+                    break
+
+        if winner is None:
+            winner = primary
+
+        hedging.record_hedge(winner is hedge)
+
+        # Discard the other request (cancelling it if it hasn't been sent)
+        for future in {primary, hedge} - {winner}:
+            if not future.cancel():
+                future.add_done_callback(_close_response)
+
+        return winner.result()
+
+    def _send_single_flight(self, key, send):
+        """
+        Send a request unless an identical request is already in flight, in
+        which case wait for and share its response.
+        """
+
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.response
+
+        try:
+            flight.response = send()
+
+        except BaseException as e:
+            flight.error = e
+            raise
+
+        finally:
+            with self._flights_lock:
+                del self._flights[key]
+            flight.done.set()
+
+        return flight.response
+
+    def _update_rate_limit(self, r, request=None):
+        """
+        Update the rate limit from the headers of a response (and record the
+        outcome of the request if given).
+        """
+
+        if 'X-H51-RateLimit-Limit' in r.headers:
+            self._rate_limit = int(r.headers['X-H51-RateLimit-Limit'])
+            self._rate_limit_reset \
+                    = float(r.headers['X-H51-RateLimit-Reset'])
+            self._rate_limit_remaining \
+                    = int(r.headers['X-H51-RateLimit-Remaining'])
+
+            if self._scheduler:
+                self._scheduler.update(
+                    self._rate_limit,
+                    self._rate_limit_remaining,
+                    self._rate_limit_reset
+                )
+
+        if request is not None:
+            request['status_code'] = r.status_code
+            request['rate_limit_remaining'] = self._rate_limit_remaining
+
+
+def _close_response(future):
+    """Close the response of a discarded (hedged) request"""
+    if future.exception() is None:
+        future.result().close()
+
+
+def _get_client(handle, api_key, api_base_url, timeout):
+    """
+    Return the client for a handle if it was pickled within the current
+    process, otherwise the client shared within the current process for the
+    given settings (creating it if required).
+    """
+
+    # Clients are keyed by process Id so that a forked process doesn't share
+    # its parent's connections.
+    key = (os.getpid(), api_key, api_base_url, timeout)
+
+    with _clients_lock:
+        if handle[0] == os.getpid():
+            client = _pickled_clients.get(handle)
+            if client is not None:
+                return client
+
+        if key not in _clients:
+            _clients[key] = Client(
+                api_key,
+                api_base_url=api_base_url,
+                timeout=timeout
+            )
+
+        return _clients[key]
+
+
+def _get_digest(headers):
+    """
+    Return a hash object and the expected digest for a body from the
+    digest (`Repr-Digest` or `Digest`) headers of a response, or `None` if
+    the response has no digest in a supported algorithm.
+    """
+
+    algorithms = {
+        'md5': 'md5',
+        'sha': 'sha1',
+        'sha-256': 'sha256',
+        'sha-512': 'sha512'
+    }
+
+    for header in ['Repr-Digest', 'Digest']:
+        for value in headers.get(header, '').split(','):
+            name, _, encoded = value.strip().partition('=')
+            name = name.lower()
+
+            if name not in algorithms or not encoded:
+                continue
+
+            try:
+                expected = base64.b64decode(encoded.strip(':'))
+
+            except ValueError:
+                continue
+
+            return (hashlib.new(algorithms[name]), expected)
+
+
+def _verify_download(size, expected_size, digest):
+    """
+    Raise an error if a download's size or digest don't match those expected
+    """
+
+    if expected_size is not None and size != expected_size:
+        raise IOError(
+            f'Downloaded {size} bytes, expected {expected_size} bytes'
+        )
+
+    if digest and digest[0].digest() != digest[1]:
+        raise IOError('The downloaded body does not match its digest')
+
+
+class _Flight:
+    """
+    A request in flight that identical requests can wait on.
+    """
+
+    def __init__(self):
+
+        # An event set once the request has completed
+        self.done = threading.Event()
+
+        # The response (or error) for the request
+        self.response = None
+        self.error = None
@@ -0,0 +1,88 @@
+import json
+
+__all__ = [
+    'JSONCodec',
+    'MsgspecCodec',
+    'OrjsonCodec',
+    'get_default_codec'
+]
+
+
+# NOTE: Codecs are used by the API client to decode JSON response bodies and
+# by the resource classes to encode JSON arguments (such as analyzers and
+# variations). Faster codecs are used automatically when the libraries they
+# depend on are installed.
+
+
+class JSONCodec:
+    """
+    A JSON codec using the standard library `json` module.
+    """
+
+    name = 'json'
+
+    def dumps(self, obj):
+        """Encode an object as a JSON string"""
+        return json.dumps(obj)
+
+    def loads(self, s):
+        """Decode a JSON string (or bytes) to an object"""
+        return json.loads(s)
+
+
+class OrjsonCodec(JSONCodec):
+    """
+    A JSON codec using `orjson`.
+    """
+
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+
+    def dumps(self, obj):
+        return self._orjson.dumps(obj).decode('utf-8')
+
+    def loads(self, s):
+        return self._orjson.loads(s)
+
+
+class MsgspecCodec(JSONCodec):
+    """
+    A JSON codec using `msgspec`.
+    """
+
+    name = 'msgspec'
+
+    def __init__(self):
+        import msgspec
+        self._msgspec = msgspec
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj):
+        return self._encoder.encode(obj).decode('utf-8')
+
+    def loads(self, s):
+        try:
+            return self._decoder.decode(s)
+
+        except self._msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+
+def get_default_codec():
+    """
+    Return the fastest codec available (`orjson`, then `msgspec`, then the
+    standard library `json` module).
+    """
+
+    for codec_cls in [OrjsonCodec, MsgspecCodec]:
+        try:
+            return codec_cls()
+
+        except ImportError:
+            pass
+
+    return JSONCodec()
@@ -0,0 +1,154 @@
+import collections
+import contextlib
+import threading
+import time
+
+from . import exceptions
+
+__all__ = ['AdaptiveLimiter']
+
+
+class AdaptiveLimiter:
+    """
+    An AIMD (additive increase, multiplicative decrease) controller for the
+    number of requests in flight.
+
+    The limit grows by `increase` for each window of successful requests and
+    is cut by the `decrease` factor when a request is throttled (429), times
+    out or fails, or when latency rises above `latency_tolerance` times the
+    recent minimum latency. While the remaining rate limit is at or below
+    `rate_buffer` the limit is held rather than increased.
+    """
+
+    def __init__(
+        self,
+        initial=4,
+        min_limit=1,
+        max_limit=64,
+        increase=1,
+        decrease=0.5,
+        latency_tolerance=2.0,
+        rate_buffer=0,
+        window=100
+    ):
+
+        # The bounds of the limit and its current value
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._limit = float(min(max(initial, min_limit), max_limit))
+
+        # The AIMD parameters
+        self._increase = increase
+        self._decrease = decrease
+        self._latency_tolerance = latency_tolerance
+        self._rate_buffer = rate_buffer
+
+        # Recent latencies (used to find the baseline latency)
+        self._latencies = collections.deque(maxlen=window)
+
+        # The time the limit was last decreased (the limit is decreased at
+        # most once per baseline latency so that a burst of failures from
+        # requests sent together counts as one congestion event).
+        self._last_decrease = 0.0
+
+        self._condition = threading.Condition()
+        self._in_flight = 0
+
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+    @property
+    def limit(self):
+        return int(self._limit)
+
+    def acquire(self):
+        """Wait until the number of requests in flight is below the limit"""
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(
+        self,
+        latency=None,
+        throttled=False,
+        failed=False,
+        rate_limit_remaining=None
+    ):
+        """
+        Release a request granted by `acquire` and adjust the limit based on
+        its outcome.
+        """
+
+        with self._condition:
+            self._in_flight -= 1
+
+            baseline = min(self._latencies) if self._latencies else None
+            if latency is not None and not (throttled or failed):
+                self._latencies.append(latency)
+
+            congested = throttled or failed or (
+                latency is not None
+                and baseline is not None
+                and latency > baseline * self._latency_tolerance
+            )
+
+            if congested:
+                now = time.monotonic()
+                if now - self._last_decrease >= (baseline or 0):
+                    self._last_decrease = now
+                    self._limit = max(
+                        self._min_limit,
+                        self._limit * self._decrease
+                    )
+
+            elif rate_limit_remaining is None \
+                    or rate_limit_remaining > self._rate_buffer:
+
+                # Increase the limit by `increase` per window of requests
+                self._limit = min(
+                    self._max_limit,
+                    self._limit + self._increase / self._limit
+                )
+
+            self._condition.notify_all()
+
+    @contextlib.contextmanager
+    def slot(self, measure_latency=True):
+        """
+        Return a context manager that acquires a slot for a request and
+        releases it with the outcome of the request. The caller can record
+        the status code of the response in the yielded dictionary, e.g:
+
+            with limiter.slot() as request:
+                r = session.get(...)
+                request['status_code'] = r.status_code
+                request['rate_limit_remaining'] = ...
+        """
+
+        self.acquire()
+        request = {'status_code': None, 'rate_limit_remaining': None}
+        started = time.monotonic()
+        failed = False
+
+        try:
+            yield request
+
+        except exceptions.H51RequestLimitExceeded:
+            request['status_code'] = 429
+            raise
+
+        except OSError:
+            # Timeouts and connection errors
+            failed = True
+            raise
+
+        finally:
+            self.release(
+                latency=time.monotonic() - started \
+                        if measure_latency else None,
+                throttled=request['status_code'] == 429,
+                failed=failed or (request['status_code'] or 0) >= 500,
+                rate_limit_remaining=request['rate_limit_remaining']
+            )
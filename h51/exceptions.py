@@ -1,5 +1,4 @@
 import copy
-import inspect
 
 __all__ = [
     'H51Exception',
@@ -31,6 +30,7 @@ class H51Exception(Exception):
         self._arg_errors = arg_errors
 
     def __str__(self):
+        import inspect
 
         doc_str = inspect.cleandoc(self.__class__.__doc__)
         parts = [f'[{self.status_code}] {doc_str}']
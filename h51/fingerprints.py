@@ -0,0 +1,154 @@
+import hashlib
+import json
+import sqlite3
+import threading
+
+__all__ = [
+    'FingerprintStore',
+    'fingerprint'
+]
+
+
+def fingerprint(items):
+    """
+    Return a fingerprint for an analyzer, transform or list of them (e.g a
+    variation's recipe), identical configurations have identical
+    fingerprints.
+    """
+
+    if isinstance(items, (list, tuple)):
+        json_type = [i.to_json_type() for i in items]
+    else:
+        json_type = items.to_json_type()
+
+    return hashlib.sha1(
+        json.dumps(json_type, sort_keys=True, separators=(',', ':'))
+            .encode('utf-8')
+    ).hexdigest()
+
+
+class FingerprintStore:
+    """
+    A local (SQLite) record of the fingerprints of the variation recipes and
+    analyzers that have been applied to assets.
+    """
+
+    def __init__(self, path=':memory:'):
+
+        # The path to the SQLite database the fingerprints are stored in
+        self._path = path
+
+        # The connection to the database (shared between threads)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+
+        with self._lock, self._db:
+            self._db.execute(
+                '''
+                CREATE TABLE IF NOT EXISTS fingerprints (
+                    uid TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    PRIMARY KEY (uid, kind, name)
+                )
+                '''
+            )
+
+    @property
+    def path(self):
+        return self._path
+
+    def close(self):
+        """Close the connection to the database"""
+        with self._lock:
+            self._db.close()
+
+    def get(self, uid, kind, name):
+        """
+        Return the fingerprint recorded for the named variation/analyzer
+        (`kind`) of an asset.
+        """
+        with self._lock:
+            row = self._db.execute(
+                'SELECT fingerprint FROM fingerprints '
+                'WHERE uid = ? AND kind = ? AND name = ?',
+                (uid, kind, name)
+            ).fetchone()
+
+        return row[0] if row else None
+
+    def get_many(self, uids, kind):
+        """
+        Return the fingerprints recorded for the variations/analyzers (`kind`)
+        of one or more assets as `{uid: {name: fingerprint}}`.
+        """
+
+        uids = list(uids)
+        fingerprints = {uid: {} for uid in uids}
+
+        with self._lock:
+            for i in range(0, len(uids), 500):
+                chunk = uids[i:i + 500]
+                for uid, name, fp in self._db.execute(
+                    'SELECT uid, name, fingerprint FROM fingerprints '
+                    'WHERE kind = ? AND uid IN ('
+                    + ','.join('?' * len(chunk)) + ')',
+                    [kind, *chunk]
+                ):
+                    fingerprints[uid][name] = fp
+
+        return fingerprints
+
+    def record_analyzers(self, uid, analyzers):
+        """
+        Record the analyzers run for an asset, e.g when notified that
+        analysis requested with a `notification_url` has completed.
+        """
+        self.set_many([
+            (uid, 'analyzer', a.name, fingerprint(a)) for a in analyzers
+        ])
+
+    def record_variations(self, uid, variations):
+        """
+        Record the recipes of variations created for an asset, e.g when
+        notified that variations requested with a `notification_url` have
+        been created.
+        """
+        self.set_many([
+            (uid, 'variation', name, fingerprint(transforms))
+            for name, transforms in variations.items()
+        ])
+
+    def remove(self, uid, kind=None, name=None):
+        """Remove fingerprints recorded for an asset"""
+
+        sql = 'DELETE FROM fingerprints WHERE uid = ?'
+        args = [uid]
+
+        if kind is not None:
+            sql += ' AND kind = ?'
+            args.append(kind)
+
+        if name is not None:
+            sql += ' AND name = ?'
+            args.append(name)
+
+        with self._lock, self._db:
+            self._db.execute(sql, args)
+
+    def set(self, uid, kind, name, fingerprint):
+        """Record the fingerprint for the named variation/analyzer"""
+        self.set_many([(uid, kind, name, fingerprint)])
+
+    def set_many(self, rows):
+        """
+        Record fingerprints from a list of `(uid, kind, name, fingerprint)`
+        tuples.
+        """
+        with self._lock, self._db:
+            self._db.executemany(
+                'INSERT OR REPLACE INTO fingerprints '
+                '(uid, kind, name, fingerprint) VALUES (?, ?, ?, ?)',
+                rows
+            )
@@ -0,0 +1,266 @@
+import math
+
+__all__ = [
+    'Geometry',
+    'plan',
+    'plan_many'
+]
+
+
+# NOTE: The geometry planner predicts the output of a chain of transforms
+# without calling the API. It models the transforms using the same rules the
+# image transforms follow, boxes (crops and focal points) are expressed as
+# `(top, left, bottom, right)` with values relative (0.0-1.0) to the size of
+# the image they apply to.
+
+
+class Geometry:
+    """
+    The predicted geometry of an image (or image variation).
+    """
+
+    def __init__(
+        self,
+        width,
+        height,
+        orientation=1,
+        focal_point=None,
+        image_format=None,
+        crop=None,
+        scale=1.0
+    ):
+
+        # The size of the image in pixels
+        self.width = width
+        self.height = height
+
+        # The Exif orientation of the image (1-8)
+        self.orientation = orientation or 1
+
+        # The focal point of the image as a relative box, if known
+        self.focal_point = focal_point
+
+        # The format the image will be output as, if known
+        self.image_format = image_format
+
+        # The last crop applied to the image as a pixel box within the image
+        # it was applied to.
+        self.crop = crop
+
+        # The number of output pixels per source pixel (along each axis)
+        self.scale = scale
+
+    def __eq__(self, other):
+        if not isinstance(other, Geometry):
+            return NotImplemented
+        return self.to_json_type() == other.to_json_type()
+
+    def __repr__(self):
+        return (
+            f'<Geometry {self.width}x{self.height}'
+            f'{" " + self.image_format if self.image_format else ""}>'
+        )
+
+    @property
+    def aspect_ratio(self):
+        return self.width / self.height
+
+    @property
+    def size(self):
+        return (self.width, self.height)
+
+    def copy(self, **changes):
+        """Return a copy of the geometry with the given changes applied"""
+        attrs = {
+            'width': self.width,
+            'height': self.height,
+            'orientation': self.orientation,
+            'focal_point': self.focal_point,
+            'image_format': self.image_format,
+            'crop': self.crop,
+            'scale': self.scale
+        }
+        attrs.update(changes)
+        return self.__class__(**attrs)
+
+    def to_json_type(self):
+        return {
+            'width': self.width,
+            'height': self.height,
+            'orientation': self.orientation,
+            'focal_point': list(self.focal_point) \
+                    if self.focal_point else None,
+            'image_format': self.image_format,
+            'crop': list(self.crop) if self.crop else None,
+            'scale': self.scale
+        }
+
+    @classmethod
+    def from_asset(cls, asset):
+        """
+        Return the geometry for an asset (or asset document), the document
+        must contain image information in its meta data.
+        """
+
+        document = asset._document if hasattr(asset, '_document') else asset
+        meta = document.get('meta') or {}
+        image = meta.get('image') or {}
+
+        # Size
+        if image.get('size'):
+            width, height = image['size']
+        else:
+            width, height = image.get('width'), image.get('height')
+
+        if not (width and height):
+            raise ValueError(
+                f"No image size for asset '{document.get('uid')}'"
+            )
+
+        # Focal point
+        focal_point = meta.get('focal_point')
+        if isinstance(focal_point, dict):
+            focal_point = tuple(
+                focal_point[k] for k in ['top', 'left', 'bottom', 'right']
+            )
+
+        elif focal_point:
+            focal_point = tuple(focal_point)
+
+        return cls(
+            int(width),
+            int(height),
+            orientation=image.get('orientation'),
+            focal_point=focal_point,
+            image_format=image.get('format')
+        )
+
+
+def plan(asset, transforms):
+    """
+    Return the predicted geometry for the given asset (or asset document /
+    `Geometry`) after the transforms have been applied.
+    """
+
+    if isinstance(asset, Geometry):
+        geometry = asset
+    else:
+        geometry = Geometry.from_asset(asset)
+
+    for transform in transforms:
+        geometry = transform.predict(geometry)
+
+    return geometry
+
+
+def plan_many(assets, variations, local=False):
+    """
+    Return the predicted geometries for a set of variations across many
+    assets (or asset documents) as a dictionary of
+    `{uid: {variation_name: geometry}}`.
+
+    If `local` is true then `variations` should be a dictionary of variations
+    per asset uid (mirroring `Variation.create_many`).
+    """
+
+    plans = {}
+    for asset in assets:
+
+        document = asset._document if hasattr(asset, '_document') else asset
+        uid = document['uid']
+
+        asset_variations = variations.get(uid, {}) if local else variations
+        if not asset_variations:
+            continue
+
+        geometry = Geometry.from_asset(document)
+        plans[uid] = {
+            name: plan(geometry, transforms)
+            for name, transforms in asset_variations.items()
+        }
+
+    return plans
+
+
+# Box utilities
+
+def clamp_box(box):
+    """Clamp a relative box so that it lies within the image"""
+    top, left, bottom, right = [min(max(v, 0.0), 1.0) for v in box]
+    top, bottom = sorted([top, bottom])
+    left, right = sorted([left, right])
+    return (top, left, bottom, right)
+
+
+def crop(geometry, box):
+    """Return the geometry after cropping it to the given relative box"""
+
+    top, left, bottom, right = clamp_box(box)
+
+    # Convert the box to pixels
+    pixel_box = (
+        round(top * geometry.height),
+        round(left * geometry.width),
+        round(bottom * geometry.height),
+        round(right * geometry.width)
+    )
+
+    # Map the focal point into the cropped image
+    focal_point = geometry.focal_point
+    if focal_point and bottom > top and right > left:
+        focal_point = clamp_box((
+            (focal_point[0] - top) / (bottom - top),
+            (focal_point[1] - left) / (right - left),
+            (focal_point[2] - top) / (bottom - top),
+            (focal_point[3] - left) / (right - left)
+        ))
+
+    return geometry.copy(
+        width=max(1, pixel_box[3] - pixel_box[1]),
+        height=max(1, pixel_box[2] - pixel_box[0]),
+        focal_point=focal_point,
+        crop=pixel_box
+    )
+
+
+def orient_box(box, orientation):
+    """
+    Return a relative box mapped from the stored image to the image after
+    applying the given Exif orientation.
+    """
+
+    top, left, bottom, right = box
+
+    return {
+        1: (top, left, bottom, right),
+        2: (top, 1 - right, bottom, 1 - left),
+        3: (1 - bottom, 1 - right, 1 - top, 1 - left),
+        4: (1 - bottom, left, 1 - top, right),
+        5: (left, top, right, bottom),
+        6: (left, 1 - bottom, right, 1 - top),
+        7: (1 - right, 1 - bottom, 1 - left, 1 - top),
+        8: (1 - right, top, 1 - left, bottom)
+    }.get(orientation, box)
+
+
+def rotate_box(box, degrees, width, height, new_width, new_height):
+    """
+    Return a relative box mapped from an image to the same image rotated
+    counter-clockwise by the given degrees (and expanded to fit).
+    """
+
+    top, left, bottom, right = box
+    radians = math.radians(degrees)
+    cos, sin = math.cos(radians), math.sin(radians)
+
+    xs = []
+    ys = []
+    for x, y in [(left, top), (right, top), (right, bottom), (left, bottom)]:
+
+        # Rotate the corner (in pixels) around the center of the image
+        x = x * width - width / 2
+        y = y * height - height / 2
+        xs.append((x * cos + y * sin + new_width / 2) / new_width)
+        ys.append((-x * sin + y * cos + new_height / 2) / new_height)
+
+    return clamp_box((min(ys), min(xs), max(ys), max(xs)))
@@ -0,0 +1,106 @@
+import collections
+import math
+import threading
+
+__all__ = ['HedgePolicy']
+
+
+class HedgePolicy:
+    """
+    A policy for hedging idempotent (GET) requests. If a request hasn't
+    answered within the given percentile of recent latencies a duplicate
+    request is sent and whichever answers first is used.
+
+    Hedging only starts once `min_samples` latencies have been recorded, and
+    the hedge delay is clamped to between `min_delay` and `max_delay` (if
+    given) seconds.
+
+    Downloads (e.g. `Asset.download`) are only hedged if `hedge_downloads`
+    is true, in which case their latencies are recorded separately from
+    those of other requests. As the latency of a download depends on its
+    size this is only suitable where downloads are of a similar (small)
+    size, such as thumbnail variations.
+    """
+
+    def __init__(
+        self,
+        percentile=95,
+        min_delay=0.005,
+        max_delay=None,
+        min_samples=20,
+        window=200,
+        hedge_downloads=False
+    ):
+
+        # The percentile of recent latencies after which a request is hedged
+        self._percentile = percentile
+
+        # The bounds of the hedge delay
+        self._min_delay = min_delay
+        self._max_delay = max_delay
+
+        # The number of latencies required before requests are hedged
+        self._min_samples = min_samples
+
+        # A flag indicating if downloads should be hedged
+        self._hedge_downloads = hedge_downloads
+
+        # Recent latencies for requests and downloads
+        self._latencies = {
+            False: collections.deque(maxlen=window),
+            True: collections.deque(maxlen=window)
+        }
+        self._lock = threading.Lock()
+
+        # Counters for the number of hedged requests sent and won (the hedge
+        # answered first).
+        self._hedges_sent = 0
+        self._hedges_won = 0
+
+    @property
+    def hedges_sent(self):
+        return self._hedges_sent
+
+    @property
+    def hedges_won(self):
+        return self._hedges_won
+
+    @property
+    def hedge_downloads(self):
+        return self._hedge_downloads
+
+    def delay(self, download=False):
+        """
+        Return the delay (in seconds) after which a request (or download)
+        should be hedged, or `None` if there are not yet enough latencies
+        recorded.
+        """
+
+        with self._lock:
+            if len(self._latencies[download]) < self._min_samples:
+                return None
+
+            latencies = sorted(self._latencies[download])
+
+        index = min(
+            len(latencies) - 1,
+            math.ceil(len(latencies) * self._percentile / 100) - 1
+        )
+        delay = max(self._min_delay, latencies[max(0, index)])
+
+        if self._max_delay is not None:
+            delay = min(self._max_delay, delay)
+
+        return delay
+
+    def record(self, latency, download=False):
+        """Record the latency (in seconds) of a request (or download)"""
+        with self._lock:
+            self._latencies[download].append(latency)
+
+    def record_hedge(self, won):
+        """Record that a hedged request was sent (and if it won)"""
+        with self._lock:
+            self._hedges_sent += 1
+            if won:
+                self._hedges_won += 1
@@ -0,0 +1,576 @@
+from datetime import datetime
+import sqlite3
+import threading
+import time
+
+from . import resources
+
+__all__ = ['Mirror']
+
+
+# NOTE: The mirror stores the raw documents returned by the API (before they
+# are wrapped by a resource class) so that they can be wrapped on read exactly
+# as if they had just been fetched.
+#
+# Alongside each document the mirror maintains indexed columns and tables
+# (type, secure, dates, variation names, dominant colors, focal point and meta
+# keys) used by `Mirror.query`, these are rebuilt from the stored documents if
+# the schema is upgraded.
+
+# The version of the mirror's schema
+SCHEMA_VERSION = 1
+
+
+class Mirror:
+    """
+    A local (SQLite) mirror of the assets within an account.
+    """
+
+    def __init__(self, client, path=':memory:'):
+
+        # The API client used to sync the mirror
+        self._client = client
+
+        # The path to the SQLite database the mirror is stored in
+        self._path = path
+
+        # The connection to the database (shared between threads)
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+
+        with self._lock, self._db:
+            self._db.executescript(
+                '''
+                CREATE TABLE IF NOT EXISTS assets (
+                    uid TEXT PRIMARY KEY,
+                    modified TEXT,
+                    partial INTEGER NOT NULL,
+                    document TEXT NOT NULL,
+                    sync_pass TEXT
+                );
+
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+
+                CREATE TABLE IF NOT EXISTS asset_index (
+                    uid TEXT PRIMARY KEY,
+                    name TEXT,
+                    type TEXT,
+                    secure INTEGER,
+                    expires REAL,
+                    created REAL,
+                    modified REAL,
+                    focal_top REAL,
+                    focal_left REAL,
+                    focal_bottom REAL,
+                    focal_right REAL
+                );
+
+                CREATE INDEX IF NOT EXISTS asset_index_type
+                    ON asset_index (type, secure);
+                CREATE INDEX IF NOT EXISTS asset_index_expires
+                    ON asset_index (expires);
+                CREATE INDEX IF NOT EXISTS asset_index_created
+                    ON asset_index (created);
+                CREATE INDEX IF NOT EXISTS asset_index_modified
+                    ON asset_index (modified);
+
+                CREATE TABLE IF NOT EXISTS asset_variations (
+                    uid TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    PRIMARY KEY (name, uid)
+                );
+
+                CREATE TABLE IF NOT EXISTS asset_colors (
+                    uid TEXT NOT NULL,
+                    r INTEGER NOT NULL,
+                    g INTEGER NOT NULL,
+                    b INTEGER NOT NULL,
+                    weight REAL
+                );
+
+                CREATE INDEX IF NOT EXISTS asset_colors_rgb
+                    ON asset_colors (r, g, b);
+                CREATE INDEX IF NOT EXISTS asset_colors_uid
+                    ON asset_colors (uid);
+
+                CREATE TABLE IF NOT EXISTS asset_meta_keys (
+                    uid TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    PRIMARY KEY (key, uid)
+                );
+                '''
+            )
+
+            # Build the indexes for documents stored by an earlier schema
+            version = self._db.execute('PRAGMA user_version').fetchone()[0]
+            if version < SCHEMA_VERSION:
+                for uid, document in self._db.execute(
+                    'SELECT uid, document FROM assets'
+                ).fetchall():
+                    self._index(client.json_codec.loads(document))
+
+                self._db.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def __contains__(self, uid):
+        with self._lock:
+            return self._db.execute(
+                'SELECT 1 FROM assets WHERE uid = ?',
+                (uid,)
+            ).fetchone() is not None
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute(
+                'SELECT COUNT(*) FROM assets'
+            ).fetchone()[0]
+
+    @property
+    def client(self):
+        return self._client
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def last_synced(self):
+        """The time (seconds since epoch) the last full sync completed"""
+        last_synced = self._get_state('last_synced')
+        return float(last_synced) if last_synced else None
+
+    def all(self):
+        """Return all mirrored assets"""
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT partial, document FROM assets ORDER BY uid'
+            ).fetchall()
+
+        return [self._to_resource(partial, doc) for partial, doc in rows]
+
+    def close(self):
+        """Close the connection to the database"""
+        with self._lock:
+            self._db.close()
+
+    def document(self, uid):
+        """Return the raw document for the asset with the given uid"""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT document FROM assets WHERE uid = ?',
+                (uid,)
+            ).fetchone()
+
+        if row:
+            return self._client.json_codec.loads(row[0])
+
+    def one(self, uid):
+        """
+        Return the mirrored asset matching the given uid (or `None` if the
+        mirror doesn't hold the asset).
+        """
+        with self._lock:
+            row = self._db.execute(
+                'SELECT partial, document FROM assets WHERE uid = ?',
+                (uid,)
+            ).fetchone()
+
+        if row:
+            return self._to_resource(*row)
+
+    def uids(self):
+        """Return the uids of all mirrored assets"""
+        with self._lock:
+            return [
+                r[0] for r in
+                self._db.execute('SELECT uid FROM assets ORDER BY uid')
+            ]
+
+    def query(
+        self,
+        type=None,
+        secure=None,
+        q=None,
+        expires=None,
+        expires_after=None,
+        expires_before=None,
+        created_after=None,
+        created_before=None,
+        modified_after=None,
+        modified_before=None,
+        variations=None,
+        meta=None,
+        dominant_color=None,
+        color_tolerance=32,
+        min_color_weight=None,
+        focal_point_within=None,
+        after=None,
+        limit=None
+    ):
+        """
+        Return a list of (partial) assets within the mirror matching the
+        given filters (ordered by uid).
+
+        - `type`, `secure` and `q` filter as per `Asset.many` (`q` matches a
+          substring of the asset's name).
+        - `expires` filters by whether the asset has an expires time, and the
+          `*_after`/`*_before` arguments filter the `expires`, `created` and
+          `modified` times by range (datetimes or seconds since epoch).
+        - `variations` and `meta` filter to assets that have all of the named
+          variations / meta keys (e.g. `['dominant_colors']`).
+        - `dominant_color` filters to assets with a dominant color within
+          `color_tolerance` of the given `(r, g, b)` color (and optionally a
+          weight of at least `min_color_weight`).
+        - `focal_point_within` filters to assets with a focal point whose
+          center lies within the given relative `(top, left, bottom, right)`
+          box.
+        """
+
+        where = []
+        args = []
+
+        def add(condition, *condition_args):
+            where.append(condition)
+            args.extend(condition_args)
+
+        if type is not None:
+            add('i.type = ?', type)
+
+        if secure is not None:
+            add('i.secure = ?', 1 if secure else 0)
+
+        if q:
+            add("i.name LIKE ? ESCAPE '\\'", '%' + _escape_like(q) + '%')
+
+        if expires is not None:
+            add(f'i.expires IS {"NOT " if expires else ""}NULL')
+
+        for column, after_value, before_value in [
+            ('expires', expires_after, expires_before),
+            ('created', created_after, created_before),
+            ('modified', modified_after, modified_before)
+        ]:
+            if after_value is not None:
+                add(f'i.{column} >= ?', _to_timestamp(after_value))
+
+            if before_value is not None:
+                add(f'i.{column} < ?', _to_timestamp(before_value))
+
+        for name in ([variations] if isinstance(variations, str) \
+                else variations or []):
+            add(
+                'i.uid IN (SELECT uid FROM asset_variations WHERE name = ?)',
+                name
+            )
+
+        for key in ([meta] if isinstance(meta, str) else meta or []):
+            add(
+                'i.uid IN (SELECT uid FROM asset_meta_keys WHERE key = ?)',
+                key
+            )
+
+        if dominant_color is not None:
+            r, g, b = dominant_color
+            t = color_tolerance
+            sql = (
+                'SELECT uid FROM asset_colors '
+                'WHERE r BETWEEN ? AND ? AND g BETWEEN ? AND ? '
+                'AND b BETWEEN ? AND ?'
+            )
+            color_args = [r - t, r + t, g - t, g + t, b - t, b + t]
+
+            # Colors stored without a weight only match if no minimum
+            # weight is given.
+            if min_color_weight is not None:
+                sql += ' AND weight >= ?'
+                color_args.append(min_color_weight)
+
+            add(f'i.uid IN ({sql})', *color_args)
+
+        if focal_point_within is not None:
+            top, left, bottom, right = focal_point_within
+            add(
+                '(i.focal_top + i.focal_bottom) / 2 BETWEEN ? AND ? '
+                'AND (i.focal_left + i.focal_right) / 2 BETWEEN ? AND ?',
+                top, bottom, left, right
+            )
+
+        if after is not None:
+            add('i.uid > ?', after)
+
+        sql = 'SELECT a.document FROM asset_index i ' \
+                'JOIN assets a ON a.uid = i.uid'
+
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+
+        sql += ' ORDER BY i.uid'
+
+        if limit is not None:
+            sql += ' LIMIT ?'
+            args.append(limit)
+
+        with self._lock:
+            rows = self._db.execute(sql, args).fetchall()
+
+        return [self._to_resource(1, r[0]) for r in rows]
+
+    def sync(self, full_documents=True, rate_buffer=0):
+        """
+        Sync the mirror with the account.
+
+        Assets are listed a page at a time, only the documents for assets
+        that are new or have been modified since the last sync are fetched
+        and stored (if `full_documents` is false then the partial documents
+        from the listing are stored instead). Assets that are no longer
+        listed are removed once a pass completes.
+
+        If a sync is interrupted then the next sync will resume from the
+        `after` cursor of the last page synced.
+
+        Setting the `rate_buffer` to a value greater than 0 ensures the method
+        will wait before continuing if the number of remaining requests falls
+        below the given rate buffer.
+        """
+
+        client = self._client
+        stats = {'listed': 0, 'fetched': 0, 'removed': 0}
+
+        # Resume an interrupted pass or start a new one
+        sync_pass = self._get_state('sync_pass')
+        after = self._get_state('after')
+        if not sync_pass:
+            sync_pass = str(time.time())
+            after = None
+            self._set_state(sync_pass=sync_pass, after=None)
+
+        has_more = True
+        while has_more:
+
+            # Fetch a page of results
+            r = client(
+                'get',
+                'assets',
+                params={'after': after, 'limit': 100}
+            )
+            results = r['results']
+            has_more = r['has_more'] and len(results) > 0
+
+            # Find the assets that are new or have been modified
+            with self._lock:
+                stored = dict(
+                    self._db.execute(
+                        'SELECT uid, modified FROM assets WHERE uid IN ('
+                        + ','.join('?' * len(results)) + ')',
+                        [a['uid'] for a in results]
+                    ).fetchall()
+                )
+
+            documents = []
+            for result in results:
+
+                if stored.get(result['uid']) == result['modified']:
+                    continue
+
+                if full_documents:
+                    self._wait_for_rate_limit(rate_buffer)
+                    documents.append(
+                        client('get', f'assets/{result["uid"]}')
+                    )
+                    stats['fetched'] += 1
+
+                else:
+                    documents.append(result)
+
+            with self._lock, self._db:
+                for document in documents:
+                    self._db.execute(
+                        'INSERT OR REPLACE INTO assets '
+                        '(uid, modified, partial, document, sync_pass) '
+                        'VALUES (?, ?, ?, ?, ?)',
+                        (
+                            document['uid'],
+                            document['modified'],
+                            0 if full_documents else 1,
+                            client.json_codec.dumps(document),
+                            sync_pass
+                        )
+                    )
+                    self._index(document)
+
+                self._db.executemany(
+                    'UPDATE assets SET sync_pass = ? WHERE uid = ?',
+                    [(sync_pass, a['uid']) for a in results]
+                )
+
+            stats['listed'] += len(results)
+            if results:
+                after = results[-1]['uid']
+                self._set_state(after=after)
+
+            if has_more:
+                self._wait_for_rate_limit(rate_buffer)
+
+        # Remove assets that were not listed in this pass and complete it
+        with self._lock, self._db:
+            removed = [
+                r[0] for r in self._db.execute(
+                    'SELECT uid FROM assets WHERE sync_pass IS NOT ?',
+                    (sync_pass,)
+                )
+            ]
+
+            for uid in removed:
+                self._unindex(uid)
+
+            self._db.executemany(
+                'DELETE FROM assets WHERE uid = ?',
+                [(uid,) for uid in removed]
+            )
+            stats['removed'] = len(removed)
+
+        self._set_state(sync_pass=None, after=None, last_synced=time.time())
+
+        return stats
+
+    def _get_state(self, key):
+        with self._lock:
+            row = self._db.execute(
+                'SELECT value FROM sync_state WHERE key = ?',
+                (key,)
+            ).fetchone()
+
+        return row[0] if row else None
+
+    def _index(self, document):
+        """Index a document (must be called within a transaction)"""
+
+        uid = document['uid']
+        meta = document.get('meta') or {}
+        self._unindex(uid)
+
+        focal_point = meta.get('focal_point')
+        if isinstance(focal_point, dict):
+            focal_point = [
+                focal_point.get(k) for k in ['top', 'left', 'bottom', 'right']
+            ]
+
+        if not focal_point or len(focal_point) != 4:
+            focal_point = [None] * 4
+
+        self._db.execute(
+            'INSERT INTO asset_index VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            [
+                uid,
+                document.get('name'),
+                document.get('type'),
+                1 if document.get('secure') else 0,
+                _to_timestamp(document.get('expires')),
+                _to_timestamp(document.get('created')),
+                _to_timestamp(document.get('modified')),
+                *focal_point
+            ]
+        )
+
+        self._db.executemany(
+            'INSERT INTO asset_variations (uid, name) VALUES (?, ?)',
+            [(uid, name) for name in (document.get('variations') or {})]
+        )
+
+        self._db.executemany(
+            'INSERT INTO asset_meta_keys (uid, key) VALUES (?, ?)',
+            [(uid, key) for key in meta]
+        )
+
+        self._db.executemany(
+            'INSERT INTO asset_colors (uid, r, g, b, weight) '
+            'VALUES (?, ?, ?, ?, ?)',
+            [
+                (uid, *rgb, weight)
+                for rgb, weight in _dominant_colors(meta)
+            ]
+        )
+
+    def _set_state(self, **values):
+        with self._lock, self._db:
+            self._db.executemany(
+                'INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)',
+                [
+                    (k, None if v is None else str(v))
+                    for k, v in values.items()
+                ]
+            )
+
+    def _to_resource(self, partial, document):
+        document = self._client.json_codec.loads(document)
+        if partial:
+            return resources.PartialAsset(self._client, document)
+        return resources.Asset(self._client, document)
+
+    def _unindex(self, uid):
+        """Remove a document from the indexes"""
+        for table in [
+            'asset_index',
+            'asset_variations',
+            'asset_colors',
+            'asset_meta_keys'
+        ]:
+            self._db.execute(f'DELETE FROM {table} WHERE uid = ?', (uid,))
+
+    def _wait_for_rate_limit(self, rate_buffer):
+        client = self._client
+        if client.rate_limit_remaining is not None \
+                and client.rate_limit_remaining <= rate_buffer:
+
+            # Wait for the rate limit to be reset before continuing
+            time.sleep(max(0, client.rate_limit_reset - time.time()))
+
+
+def _dominant_colors(meta):
+    """
+    Return a list of `((r, g, b), weight)` tuples for the dominant colors
+    held in an asset's meta data.
+    """
+
+    colors = []
+    for color in meta.get('dominant_colors') or []:
+
+        weight = None
+        if isinstance(color, dict):
+            weight = color.get('weight')
+            color = color.get('rgb') or color.get('color')
+
+        elif len(color) == 2 and not isinstance(color[0], (int, float)):
+            color, weight = color
+
+        if isinstance(color, str):
+            color = color.lstrip('#')
+            color = [int(color[i:i + 2], 16) for i in range(0, 6, 2)]
+
+        if color and len(color) >= 3:
+            colors.append((tuple(int(c) for c in color[:3]), weight))
+
+    return colors
+
+
+def _escape_like(s):
+    return s.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _to_timestamp(value):
+    """
+    Convert a datetime, ISO 8601 string or number to seconds since epoch.
+    """
+
+    if value is None or value == '':
+        return None
+
+    if isinstance(value, datetime):
+        return value.timestamp()
+
+    if isinstance(value, str):
+        return datetime.fromisoformat(value).timestamp()
+
+    return float(value)
@@ -0,0 +1,246 @@
+import contextvars
+import functools
+import threading
+import time
+
+from . import client as _client
+from . import exceptions
+
+__all__ = ['ClientPool']
+
+
+class ClientPool:
+    """
+    A pool of API clients, one per API key (for the same account), that
+    spreads requests across the keys based on each key's remaining rate
+    limit.
+
+    The pool can be called in the same way as a `Client` and so can be used
+    in place of a client with the resource classes.
+    """
+
+    def __init__(self, api_keys, **kwargs):
+
+        if not api_keys:
+            raise ValueError('At least one API key is required')
+
+        # The clients within the pool (keyword arguments are passed to each
+        # client).
+        self._clients = [_client.Client(k, **kwargs) for k in api_keys]
+
+        # The number of requests in flight for each client
+        self._in_flight = {id(c): 0 for c in self._clients}
+        self._lock = threading.Lock()
+
+    @property
+    def clients(self):
+        with self._lock:
+            return list(self._clients)
+
+    @property
+    def json_codec(self):
+        return self._clients[0].json_codec
+
+    @property
+    def rate_limit(self):
+        limits = [c.rate_limit for c in self.clients]
+        known = [l for l in limits if l is not None]
+        if known:
+            # Keys that have not yet been used are assumed to have the same
+            # limit as those that have (keys belong to the same account).
+            return sum(known) + (len(limits) - len(known)) * max(known)
+
+    @property
+    def rate_limit_reset(self):
+        resets = [c.rate_limit_reset for c in self.clients]
+        resets = [r for r in resets if r is not None]
+        if resets:
+            return min(resets)
+
+    @property
+    def rate_limit_remaining(self):
+        with self._lock:
+            known = [
+                c.rate_limit for c in self._clients
+                if c.rate_limit is not None
+            ]
+            if not known:
+                return None
+
+            # Keys that have not yet been used are assumed to have their full
+            # limit remaining (less any requests in flight).
+            remaining = 0
+            for client in self._clients:
+                client_remaining = self._remaining(client)
+                if client_remaining is None:
+                    client_remaining = max(
+                        0,
+                        max(known) - self._in_flight[id(client)]
+                    )
+                remaining += client_remaining
+
+            return remaining
+
+    def __call__(self, *args, **kwargs):
+        """Call the API using the client with the most remaining requests"""
+
+        # Upload files are rewound to their start position if the call is
+        # retried with another key.
+        files = kwargs.get('files') or (args[4] if len(args) > 4 else None)
+
+        return self._route(
+            lambda client: client(*args, **kwargs),
+            _file_positions(files)
+        )
+
+    def __reduce__(self):
+        """
+        Pickle the pool as the handles of its clients (see
+        `Client.__reduce__`).
+        """
+        return (_restore_pool, (self.clients,))
+
+    async def acall(self, *args, **kwargs):
+        """
+        Call the API from a coroutine (the request is made in the event
+        loop's default executor).
+        """
+        import asyncio
+
+        # Run the call within a copy of the current context so that the
+        # priority set by the caller is kept.
+        context = contextvars.copy_context()
+
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            None,
+            functools.partial(context.run, self, *args, **kwargs)
+        )
+
+    def download_into(self, path, buffer=None):
+        """
+        Download the body for the given API path into a buffer using the
+        client with the most remaining requests (see `Client.download_into`).
+        """
+        return self._route(lambda client: client.download_into(path, buffer))
+
+    def download_to(
+        self,
+        path,
+        file_path,
+        segments=4,
+        min_segment_size=8 * 1024 * 1024
+    ):
+        """
+        Download the body for the given API path to a file using the client
+        with the most remaining requests (see `Client.download_to`).
+        """
+        return self._route(
+            lambda client: client.download_to(
+                path,
+                file_path,
+                segments=segments,
+                min_segment_size=min_segment_size
+            )
+        )
+
+    def _priority(self, client):
+        """
+        Return the priority of a client, clients that have not yet been used
+        (and so have an unknown rate limit) are prioritized.
+        """
+        remaining = self._remaining(client)
+        if remaining is None:
+            return (1, -self._in_flight[id(client)])
+        return (0, remaining)
+
+    def _remaining(self, client):
+        """
+        Return the estimated number of requests remaining for a client
+        (excluding requests in flight).
+        """
+
+        if client.rate_limit_remaining is None:
+            return None
+
+        if client.rate_limit_reset <= time.time():
+            remaining = client.rate_limit
+        else:
+            remaining = client.rate_limit_remaining
+
+        return max(0, remaining - self._in_flight[id(client)])
+
+    def _route(self, call, positions=()):
+        """
+        Make a call (a function that takes a client) using the client with
+        the most remaining requests, retrying with another client if the
+        client's API key is rejected. Any upload files (`positions`) are
+        rewound before the call is retried (`None` if the call can't be
+        retried).
+        """
+
+        while True:
+
+            with self._lock:
+                if not self._clients:
+                    raise exceptions.H51Unauthorized(
+                        401,
+                        'None of the API keys in the pool are valid'
+                    )
+
+                client = max(self._clients, key=self._priority)
+                self._in_flight[id(client)] += 1
+
+            try:
+                return call(client)
+
+            except exceptions.H51Unauthorized:
+
+                # Drop the client from the pool and retry with another
+                with self._lock:
+                    if client in self._clients:
+                        self._clients.remove(client)
+
+                if positions is None:
+                    # The files can't be rewound so the call can't be retried
+                    raise
+
+                for file, position in positions:
+                    file.seek(position)
+
+            finally:
+                with self._lock:
+                    self._in_flight[id(client)] -= 1
+
+
+def _restore_pool(clients):
+    """Return a pool for clients restored from a pickle"""
+    pool = ClientPool.__new__(ClientPool)
+    pool._clients = list(clients)
+    pool._in_flight = {id(c): 0 for c in pool._clients}
+    pool._lock = threading.Lock()
+    return pool
+
+
+def _file_positions(files):
+    """
+    Return the upload files of a call with their current positions (or
+    `None` if any of the files can't be rewound).
+    """
+
+    positions = []
+    for file in (files or {}).values():
+
+        if isinstance(file, (tuple, list)):
+            file = file[1]
+
+        if isinstance(file, (bytes, str)):
+            continue
+
+        try:
+            positions.append((file, file.tell()))
+
+        except (AttributeError, OSError):
+            return None
+
+    return positions
@@ -0,0 +1,144 @@
+"""
+Pre-upload processing of original images.
+
+NOTE: This module requires Pillow (`pip install h51[images]`).
+"""
+
+from concurrent import futures
+import math
+import os
+import tempfile
+
+from . import geometry
+
+__all__ = [
+    'downscale',
+    'downscale_file',
+    'required_scale'
+]
+
+# The Exif tag holding an image's orientation
+EXIF_ORIENTATION = 0x0112
+
+
+def required_scale(image_geometry, variations, headroom=1.0):
+    """
+    Return the largest scale (relative to the original image) that any of
+    the variations require, e.g 0.25 means an original a quarter of the size
+    would produce identical variations.
+
+    NOTE: The focal point of an image isn't known before it's uploaded (and
+    analyzed), focal point crops are therefore planned as if the whole image
+    were the focal point. Set `headroom` (e.g 1.5) to keep extra resolution
+    for recipes that crop tightly around a focal point.
+    """
+
+    scale = max(
+        [
+            geometry.plan(image_geometry, transforms).scale
+            for transforms in variations.values()
+        ],
+        default=1.0
+    )
+    return min(1.0, scale * headroom)
+
+
+def downscale_file(
+    path,
+    variations,
+    output_path=None,
+    headroom=1.0,
+    quality=95,
+    min_saving=0.1
+):
+    """
+    Downscale an image to the largest size any of the variations require,
+    and return the path to the downscaled image (or the original path if the
+    image doesn't need to be downscaled).
+
+    The image's Exif data (including its orientation) and ICC profile are
+    kept, so transforms such as `AutoOrient` behave as they would for the
+    original. If no `output_path` is given the image is written to a
+    temporary file that the caller is responsible for removing.
+
+    Images are only downscaled if the scale saves at least `min_saving` of
+    each dimension, animated images and images in formats Pillow can't
+    write are never downscaled.
+    """
+
+    from PIL import Image
+
+    with Image.open(path) as image:
+
+        if getattr(image, 'n_frames', 1) > 1:
+            return path
+
+        orientation = image.getexif().get(EXIF_ORIENTATION, 1)
+        scale = required_scale(
+            geometry.Geometry(
+                image.width,
+                image.height,
+                orientation=orientation,
+                image_format=image.format
+            ),
+            variations,
+            headroom=headroom
+        )
+
+        if scale > 1.0 - min_saving:
+            return path
+
+        # Resize the stored pixels (the orientation is applied by the
+        # `AutoOrient` transform later).
+        resized = image.resize(
+            (
+                max(1, math.ceil(image.width * scale)),
+                max(1, math.ceil(image.height * scale))
+            ),
+            Image.LANCZOS
+        )
+
+        options = {}
+        if image.info.get('exif'):
+            options['exif'] = image.info['exif']
+
+        if image.info.get('icc_profile'):
+            options['icc_profile'] = image.info['icc_profile']
+
+        if image.format in ['JPEG', 'WEBP']:
+            options['quality'] = quality
+
+        temporary = output_path is None
+        if temporary:
+            fd, output_path = tempfile.mkstemp(
+                suffix=os.path.splitext(path)[1]
+            )
+            os.close(fd)
+
+        try:
+            resized.save(output_path, format=image.format, **options)
+
+        except Exception:
+            # Pillow can read but not write some formats (e.g. PSD), in which
+            # case the original is used.
+            if temporary:
+                os.remove(output_path)
+            return path
+
+    return output_path
+
+
+def downscale(paths, variations, max_workers=None, **kwargs):
+    """
+    Downscale many images in a process pool (see `downscale_file`) and
+    return a dictionary mapping each path to the path of the image to
+    upload.
+    """
+
+    with futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = {
+            path: executor.submit(downscale_file, path, variations, **kwargs)
+            for path in paths
+        }
+
+        return {path: future.result() for path, future in results.items()}
@@ -0,0 +1,439 @@
+"""
+Recording traces of the calls a client makes and replaying them against a
+local stand-in server, e.g to see how the client behaves at 10x the load.
+
+A trace is a JSON lines file with one line per call to `Client.__call__`:
+
+    {"t": 0.0132, "m": "GET", "p": "assets/abc", "q": 0, "r": 1876,
+        "s": 200, "l": 0.0841}
+
+- `t`: the time (in seconds) the call was made since recording started
+- `m`: the HTTP method
+- `p`: the API path
+- `q`: the size of the request body (in bytes)
+- `r`: the size of the response body (in bytes)
+- `s`: the status code of the response (`null` if the request failed)
+- `l`: the latency (in seconds) of the call
+- `d`/`f`: set to `true` for downloads/file uploads
+
+The API key, request parameters and the content of request/response bodies
+are never recorded.
+"""
+
+from concurrent import futures
+import http.server
+import io
+import json
+import math
+import multiprocessing
+import sys
+import threading
+import time
+import urllib.parse
+
+from . import exceptions
+
+__all__ = [
+    'StandInServer',
+    'TraceRecorder',
+    'read_trace',
+    'replay'
+]
+
+
+class TraceRecorder:
+    """
+    Record a trace of the calls made by a client, e.g:
+
+        recorder = h51.replay.TraceRecorder('h51.trace')
+        client = h51.Client('your_api_key...', recorder=recorder)
+    """
+
+    def __init__(self, path):
+
+        # The path to the file the trace is written to
+        self._path = path
+
+        self._lock = threading.Lock()
+        self._file = open(path, 'a')
+        self._started = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def path(self):
+        return self._path
+
+    def close(self):
+        """Close the trace file"""
+        with self._lock:
+            self._file.close()
+
+    def begin(self, method, path, request_bytes, download=False, files=None):
+        """
+        Begin recording a call to the API and return the event for the call
+        (to be passed to `end` once the call completes).
+        """
+
+        event = {
+            't': round(time.monotonic() - self._started, 4),
+            'm': method.upper(),
+            'p': path,
+            'q': request_bytes + sum(
+                _file_size(f) for f in (files or {}).values()
+            )
+        }
+
+        if download:
+            event['d'] = True
+
+        if files:
+            event['f'] = True
+
+        return event
+
+    def end(self, event, response):
+        """
+        Record a call to the API once it's complete (`response` is `None` if
+        the request failed).
+        """
+
+        event['r'] = len(response.content) if response is not None else 0
+        event['s'] = response.status_code if response is not None else None
+        event['l'] = round(
+            time.monotonic() - self._started - event['t'],
+            4
+        )
+
+        line = json.dumps(event, separators=(',', ':')) + '\n'
+        with self._lock:
+            self._file.write(line)
+
+
+class StandInServer:
+    """
+    A local server that stands in for the API when replaying a trace. The
+    server runs in a separate process (so that its CPU time is not counted
+    against the client) and answers each request with a response of the
+    size, status and latency recorded in the trace.
+
+    If a `rate_limit` (requests per second) is given, requests beyond the
+    limit are rejected with a 429 response.
+    """
+
+    def __init__(self, rate_limit=None):
+
+        # The maximum number of requests per second the server accepts
+        self._rate_limit = rate_limit
+
+        # The process the server runs in and the URL it can be reached at
+        self._process = None
+        self._url = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    @property
+    def url(self):
+        return self._url
+
+    def start(self):
+        """Start the server"""
+
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        self._process = multiprocessing.Process(
+            target=_serve,
+            args=(sender, self._rate_limit),
+            daemon=True
+        )
+        self._process.start()
+        self._url = f'http://127.0.0.1:{receiver.recv()}'
+
+    def stop(self):
+        """Stop the server"""
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+            self._process = None
+
+
+def read_trace(path):
+    """Return the events in a trace file (ordered by time)"""
+
+    events = []
+    with open(path) as f:
+        for line in f:
+            try:
+                events.append(json.loads(line))
+
+            except ValueError:
+                # Ignore a partially written (final) line
+                pass
+
+    return sorted(events, key=lambda e: e['t'])
+
+
+def replay(events, client, speed=1.0, workers=32, latency_scale=1.0):
+    """
+    Replay the events of a trace using a client (connected to a
+    `StandInServer`) and return a report of how the client performed.
+
+    Calls are made at their recorded times divided by `speed`, and the
+    server answers each call after its recorded latency multiplied by
+    `latency_scale`. The report includes the throughput, latency
+    percentiles (in seconds), the number and rate of 429 responses, and the
+    CPU time and peak memory of the client process. The lag is how far
+    behind schedule calls were made (e.g because all workers were busy).
+    """
+
+    results = []
+    results_lock = threading.Lock()
+
+    def call(event, scheduled):
+
+        # Send a request body of the recorded size
+        data = files = None
+        if event.get('f'):
+            files = {'file': ('replay', io.BytesIO(bytes(event['q'])))}
+
+        elif event['q']:
+            data = {'body': 'x' * event['q']}
+
+        started = time.monotonic()
+        status = None
+        try:
+            client(
+                event['m'],
+                event['p'],
+                params={
+                    'status': event['s'] or 200,
+                    'size': event['r'],
+                    'latency': event['l'] * latency_scale
+                },
+                data=data,
+                files=files,
+                download=event.get('d', False)
+            )
+            status = 200
+
+        except exceptions.H51Exception as e:
+            status = e.status_code
+
+        except OSError:
+            pass
+
+        finished = time.monotonic()
+        with results_lock:
+            results.append((status, finished - started, started - scheduled))
+
+    cpu_started = time.process_time()
+    started = time.monotonic()
+    offset = events[0]['t'] if events else 0
+
+    with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        for event in events:
+            scheduled = started + (event['t'] - offset) / speed
+            time.sleep(max(0, scheduled - time.monotonic()))
+            executor.submit(call, event, scheduled)
+
+    duration = max(time.monotonic() - started, 1e-6)
+    cpu_time = time.process_time() - cpu_started
+
+    latencies = sorted(r[1] for r in results)
+    throttled = sum(1 for r in results if r[0] == 429)
+
+    return {
+        'requests': len(results),
+        'duration': duration,
+        'throughput': len(results) / duration,
+        'latency': {
+            f'p{p}': _percentile(latencies, p) for p in [50, 90, 99]
+        },
+        'max_latency': latencies[-1] if latencies else None,
+        'max_lag': max((r[2] for r in results), default=None),
+        'throttled': throttled,
+        'throttled_rate': throttled / len(results) if results else 0,
+        'errors': sum(1 for r in results if r[0] not in [200, 429]),
+        'cpu_time': cpu_time,
+        'cpu_utilization': cpu_time / duration,
+        'max_rss': _max_rss()
+    }
+
+
+# Utils
+
+class _StandInHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Answer requests with a response of the size, status and latency given in
+    the query string.
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_DELETE(self):
+        self._respond()
+
+    def do_GET(self):
+        self._respond()
+
+    def do_HEAD(self):
+        self._respond()
+
+    def do_POST(self):
+        self._respond()
+
+    def do_PUT(self):
+        self._respond()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _respond(self):
+
+        # Read (and discard) the request body
+        length = int(self.headers.get('Content-Length') or 0)
+        while length > 0:
+            length -= len(self.rfile.read(min(length, 65536)))
+
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+        status = int(query.get('status', [200])[0])
+        size = int(query.get('size', [0])[0])
+        time.sleep(float(query.get('latency', [0])[0]))
+
+        headers = {}
+        limiter = self.server.limiter
+        if limiter is not None:
+            allowed, remaining, reset = limiter.take()
+            headers['X-H51-RateLimit-Limit'] = str(limiter.limit)
+            headers['X-H51-RateLimit-Remaining'] = str(remaining)
+            headers['X-H51-RateLimit-Reset'] = str(reset)
+
+            if not allowed:
+                status = 429
+                size = 0
+
+        if status in [200, 204] and size:
+            if self.headers.get('Accept') == 'application/json':
+                headers['Content-Type'] = 'application/json'
+                body = b'{"x":"' + b'x' * max(0, size - 8) + b'"}'
+            else:
+                headers['Content-Type'] = 'application/octet-stream'
+                body = bytes(size)
+
+        elif status in [200, 204]:
+            body = b''
+
+        else:
+            headers['Content-Type'] = 'application/json'
+            body = b'{"hint":"Replayed error"}'
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+
+class _WindowLimiter:
+    """
+    A fixed window (per second) rate limiter.
+    """
+
+    def __init__(self, limit):
+
+        # The number of requests allowed per second
+        self.limit = limit
+
+        self._lock = threading.Lock()
+        self._window = 0
+        self._count = 0
+
+    def take(self):
+        """
+        Take a request from the current window and return whether it's
+        allowed, the number of requests remaining and when the window resets.
+        """
+
+        with self._lock:
+            window = math.floor(time.time())
+            if window != self._window:
+                self._window = window
+                self._count = 0
+
+            self._count += 1
+            return (
+                self._count <= self.limit,
+                max(0, self.limit - self._count),
+                window + 1
+            )
+
+
+def _file_size(file):
+    """Return the number of bytes remaining in a file (to be uploaded)"""
+
+    if isinstance(file, (tuple, list)):
+        file = file[1]
+
+    if isinstance(file, (bytes, str)):
+        return len(file)
+
+    try:
+        position = file.tell()
+        size = file.seek(0, io.SEEK_END) - position
+        file.seek(position)
+        return size
+
+    except (AttributeError, OSError):
+        return 0
+
+
+def _max_rss():
+    """Return the peak memory (in bytes) used by the process if known"""
+
+    try:
+        import resource
+
+    except ImportError:
+        return None
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux reports the peak in kilobytes, macOS in bytes
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+def _percentile(values, percentile):
+    """Return a percentile of a sorted list of values"""
+
+    if not values:
+        return None
+
+    index = min(len(values) - 1, math.ceil(len(values) * percentile / 100) - 1)
+    return values[max(0, index)]
+
+
+def _serve(conn, rate_limit):
+    """Run a stand-in server (in a separate process)"""
+
+    server = http.server.ThreadingHTTPServer(
+        ('127.0.0.1', 0),
+        _StandInHandler
+    )
+    server.daemon_threads = True
+    server.limiter = _WindowLimiter(rate_limit) if rate_limit else None
+
+    conn.send(server.server_address[1])
+    conn.close()
+
+    server.serve_forever()
@@ -1,8 +1,8 @@
 
 from datetime import datetime
-import json
 import time
 
+from . import fingerprints as _fingerprints
 from . import pagination
 
 
@@ -42,6 +42,21 @@ class _BaseResource:
     def __contains__(self, name):
         return name in self.__dict__['_document']
 
+    def __getstate__(self):
+        return self._document
+
+    def __setstate__(self, state):
+        self._document = state
+
+    def __reduce__(self):
+        # Resources are pickled as their document and a handle for their
+        # client (see `Client.__reduce__`).
+        return (
+            _new_resource,
+            (self.__class__, self._client),
+            self.__getstate__()
+        )
+
     def get(self, name, default=None):
         return self.__dict__['_document'].get(name, default)
 
@@ -101,22 +116,79 @@ class Asset(_BaseResource):
     def __str__(self):
         return f'Asset: {self.uid}'
 
-    def analyze(self, analyzers, notification_url=None):
-        """Analyze the asset"""
+    def __getstate__(self):
+        return dict(
+            self._document,
+            variations={n: v._document for n, v in self.variations.items()}
+        )
+
+    def __setstate__(self, state):
+        self._document = state
+        self._document['variations'] = {
+            n: Variation(self._client, self, n, v)
+            for n, v in state['variations'].items()
+        }
+
+    def analyze(
+        self,
+        analyzers,
+        notification_url=None,
+        skip_existing=False,
+        fingerprints=None
+    ):
+        """
+        Analyze the asset.
+
+        If `skip_existing` is true then analyzers whose output the asset's
+        meta already holds from an identical configuration are not run. A
+        configuration is identical if its fingerprint matches that recorded
+        in the given `FingerprintStore` or, if none is recorded, if the
+        analyzer uses its default arguments.
+
+        Analyzers are only recorded in the `FingerprintStore` once the
+        analysis has completed, so if a `notification_url` is given the
+        handler for the notification should record them (see
+        `FingerprintStore.record_analyzers`).
+        """
+
+        if skip_existing:
+            recorded = {}
+            if fingerprints:
+                recorded = fingerprints.get_many(
+                    [self.uid],
+                    'analyzer'
+                )[self.uid]
+
+            meta = self.get('meta') or {}
+            analyzers = [
+                a for a in analyzers
+                if a.name not in meta
+                or recorded.get(a.name, _default_fingerprint(a))
+                    != _fingerprints.fingerprint(a)
+            ]
+
+            if not analyzers:
+                return
 
         r = self._client(
             'post',
             f'assets/{self.uid}/analyze',
             data={
-                'analyzers': json.dumps([
+                'analyzers': self._client.json_codec.dumps([
                     a.to_json_type() for a in analyzers
                 ]),
                 'notification_url': notification_url
             }
         )
 
+        if fingerprints and not notification_url:
+            fingerprints.set_many([
+                (self.uid, 'analyzer', a.name, _fingerprints.fingerprint(a))
+                for a in analyzers
+            ])
+
         if not notification_url:
-            self.meta = r['meta']
+            self._document['meta'] = r['meta']
 
     def download(self):
         """Download the asset"""
@@ -126,11 +198,22 @@ class Asset(_BaseResource):
             download=True
         )
 
+    def download_to(self, file_path, segments=4):
+        """
+        Download the asset to a file (large files are downloaded as several
+        byte ranges in parallel).
+        """
+        return self._client.download_to(
+            f'assets/{self.uid}/download',
+            file_path,
+            segments=segments
+        )
+
     def expire(self, seconds):
         """Set an expires time for the asset"""
 
         if isinstance(seconds, datetime):
-            seconds = datetime.timestamp() - time.time()
+            seconds = seconds.timestamp() - time.time()
 
         r = self._client(
             'post',
@@ -194,7 +277,7 @@ class Asset(_BaseResource):
 
                 # Wait for the rate limit to be reset before requesting
                 # another page.
-                time.sleep(time.time() - client.rate_limit_reset)
+                time.sleep(max(0, client.rate_limit_reset - time.time()))
 
         return assets
 
@@ -205,20 +288,64 @@ class Asset(_BaseResource):
         uids,
         analyzers,
         local=False,
-        notification_url=None
+        notification_url=None,
+        skip_existing=False,
+        fingerprints=None
     ):
-        """Analyze one or more assets"""
+        """
+        Analyze one or more assets.
+
+        If `skip_existing` is true then only the analyzers for each asset
+        whose configuration differs from that recorded in the given
+        `FingerprintStore` are run (the analyzers are sent per asset as if
+        `local` were true). If no analyzers need to be run then no call is
+        made and `None` is returned.
+
+        As with `analyze`, analyzers are only recorded for synchronous calls
+        (without a `notification_url`).
+        """
+
+        if skip_existing:
+
+            if not fingerprints:
+                raise ValueError(
+                    'A fingerprint store is required to skip existing '
+                    'analysis'
+                )
+
+            if not local:
+                analyzers = {uid: analyzers for uid in uids}
+                local = True
+
+            # Find the analyzers that have not been run
+            recorded = fingerprints.get_many(uids, 'analyzer')
+            analyzers = {
+                uid: [
+                    a for a in analyzers.get(uid, [])
+                    if recorded[uid].get(a.name)
+                        != _fingerprints.fingerprint(a)
+                ]
+                for uid in uids
+            }
+
+            uids = [uid for uid in uids if analyzers[uid]]
+            analyzers = {uid: analyzers[uid] for uid in uids}
+
+            if not uids:
+                return
 
         if local:
-            analyzers_json = json.dumps({
+            analyzers_json = client.json_codec.dumps({
                 uid: [a.to_json_type() for a in local_analyzers]
                 for uid, local_analyzers in analyzers.items()
             })
 
         else:
-            analyzers_json = json.dumps([a.to_json_type() for a in analyzers])
+            analyzers_json = client.json_codec.dumps([
+                a.to_json_type() for a in analyzers
+            ])
 
-        return client(
+        r = client(
             'post',
             f'assets/analyze',
             data={
@@ -229,6 +356,15 @@ class Asset(_BaseResource):
             }
         )
 
+        if fingerprints and not notification_url:
+            fingerprints.set_many([
+                (uid, 'analyzer', a.name, _fingerprints.fingerprint(a))
+                for uid in uids
+                for a in (analyzers.get(uid, []) if local else analyzers)
+            ])
+
+        return r
+
     @classmethod
     def create(cls, client, file, name=None, expire=None, secure=False):
         """Upload an asset to Hangar51"""
@@ -254,7 +390,7 @@ class Asset(_BaseResource):
         """
 
         if isinstance(seconds, datetime):
-            seconds = datetime.timestamp() - time.time()
+            seconds = seconds.timestamp() - time.time()
 
         return client(
             'post',
@@ -380,6 +516,22 @@ class Variation(_BaseResource):
     def __str__(self):
         return f'Variation: {self._name} ({self._asset.uid})'
 
+    def __getstate__(self):
+        return {
+            'asset': self._asset,
+            'name': self._name,
+            'document': self._document
+        }
+
+    def __setstate__(self, state):
+        self._asset = state['asset']
+        self._name = state['name']
+        self._document = state['document']
+
+        # Replace the copy of the variation held by the restored asset
+        if self._name in (self._asset.variations or {}):
+            self._asset.variations[self._name] = self
+
     def download(self):
         """Download the variation"""
         return self._client(
@@ -388,6 +540,35 @@ class Variation(_BaseResource):
             download=True
         )
 
+    def download_array(self, mode='RGB', buffer=None):
+        """
+        Download the variation and decode it into a NumPy array (requires
+        NumPy and Pillow, see `h51.arrays`).
+        """
+        from . import arrays
+        return arrays.download_array(self, mode=mode, buffer=buffer)
+
+    def download_into(self, buffer=None):
+        """
+        Download the variation into a buffer and return a memoryview of the
+        bytes downloaded (see `Client.download_into`).
+        """
+        return self._client.download_into(
+            f'assets/{self._asset.uid}/variations/{self._name}/download',
+            buffer
+        )
+
+    def download_to(self, file_path, segments=4):
+        """
+        Download the variation to a file (large files are downloaded as
+        several byte ranges in parallel).
+        """
+        return self._client.download_to(
+            f'assets/{self._asset.uid}/variations/{self._name}/download',
+            file_path,
+            segments=segments
+        )
+
     def delete(self):
         """Delete the variation"""
         self._client(
@@ -397,21 +578,69 @@ class Variation(_BaseResource):
         del self._asset.variations[self._name]
 
     @classmethod
-    def create(cls, asset, variations, notification_url=None):
-        """Create a set of variations of the asset"""
+    def create(
+        cls,
+        asset,
+        variations,
+        notification_url=None,
+        incremental=False,
+        fingerprints=None
+    ):
+        """
+        Create a set of variations of the asset.
+
+        If `incremental` is true then only variations the asset doesn't
+        already have are created, if a `FingerprintStore` is also given then
+        existing variations whose recipe has changed since it was recorded
+        (or that have no recorded recipe) are also created.
+
+        Recipes are only recorded in the `FingerprintStore` once the
+        variations have been created, so if a `notification_url` is given
+        the handler for the notification should record them (see
+        `FingerprintStore.record_variations`).
+        """
+
+        recipes = {
+            name: _fingerprints.fingerprint(transforms)
+            for name, transforms in variations.items()
+        }
+
+        if incremental:
+            recorded = {}
+            if fingerprints:
+                recorded = fingerprints.get_many(
+                    [asset.uid],
+                    'variation'
+                )[asset.uid]
+
+            variations = {
+                name: transforms
+                for name, transforms in variations.items()
+                if name not in asset.variations
+                or (fingerprints and recorded.get(name) != recipes[name])
+            }
+
+            if not variations:
+                return
 
         r = asset._client(
             'put',
             f'assets/{asset.uid}/variations',
             data={
                 'notification_url': notification_url,
-                'variations': json.dumps({
+                'variations': asset._client.json_codec.dumps({
                     name: [t.to_json_type() for t in transforms]
                     for name, transforms in variations.items()
                 }),
             }
         )
 
+        if fingerprints and not notification_url:
+            fingerprints.set_many([
+                (asset.uid, 'variation', name, recipes[name])
+                for name in variations
+            ])
+
         if not notification_url:
             asset._document['variations'] = {
                 n: cls(asset._client, asset, n, v)
@@ -425,15 +654,57 @@ class Variation(_BaseResource):
         uids,
         variations,
         local=False,
-        notification_url=None
+        notification_url=None,
+        incremental=False,
+        fingerprints=None
     ):
         """
         Find one or more assets matching the given uids and create a set of
         variations for them.
+
+        If `incremental` is true then only the variations for each asset
+        whose recipe differs from that recorded in the given
+        `FingerprintStore` are created (the variations are sent per asset as
+        if `local` were true). If no variations need to be created then no
+        call is made and `None` is returned.
+
+        As with `create`, recipes are only recorded for synchronous calls
+        (without a `notification_url`).
         """
 
+        recipes = None
+        if incremental:
+
+            if not fingerprints:
+                raise ValueError(
+                    'A fingerprint store is required to create variations '
+                    'incrementally'
+                )
+
+            if not local:
+                variations = {uid: variations for uid in uids}
+                local = True
+
+            # Find the variations whose recipes have changed
+            recorded = fingerprints.get_many(uids, 'variation')
+            recipes = {}
+            for uid in uids:
+                for name, transforms in variations.get(uid, {}).items():
+                    fp = _fingerprints.fingerprint(transforms)
+                    if recorded[uid].get(name) != fp:
+                        recipes.setdefault(uid, {})[name] = fp
+
+            uids = [uid for uid in uids if uid in recipes]
+            if not uids:
+                return
+
+            variations = {
+                uid: {name: variations[uid][name] for name in recipes[uid]}
+                for uid in uids
+            }
+
         if local:
-            variations_json = json.dumps({
+            variations_json = client.json_codec.dumps({
                 uid: {
                     name: [t.to_json_type() for t in transforms]
                     for name, transforms in local_variations.items()
@@ -442,12 +713,12 @@ class Variation(_BaseResource):
             })
 
         else:
-            variations_json = json.dumps({
+            variations_json = client.json_codec.dumps({
                 name: [t.to_json_type() for t in transforms]
                 for name, transforms in variations.items()
             })
 
-        return client(
+        r = client(
             'put',
             f'assets/transform',
             data={
@@ -457,3 +728,40 @@ class Variation(_BaseResource):
                 'variations': variations_json
             }
         )
+
+        if fingerprints and not notification_url:
+            if recipes is None:
+                recipes = {
+                    uid: {
+                        name: _fingerprints.fingerprint(transforms)
+                        for name, transforms in (
+                            variations.get(uid, {}) if local else variations
+                        ).items()
+                    }
+                    for uid in uids
+                }
+
+            fingerprints.set_many([
+                (uid, 'variation', name, fp)
+                for uid in uids
+                for name, fp in recipes[uid].items()
+            ])
+
+        return r
+
+
+def _default_fingerprint(analyzer):
+    """
+    Return the fingerprint to assume for an analyzer's existing output when
+    no fingerprint has been recorded (the analyzer's own fingerprint if it
+    uses its default arguments).
+    """
+    if not analyzer.args:
+        return _fingerprints.fingerprint(analyzer)
+
+
+def _new_resource(cls, client):
+    """Return an empty resource for a resource being unpickled"""
+    resource = cls.__new__(cls)
+    resource._client = client
+    return resource
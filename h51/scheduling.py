@@ -0,0 +1,160 @@
+import contextlib
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+
+__all__ = [
+    'Scheduler',
+    'current_priority',
+    'priority'
+]
+
+# The priority of requests made within the current context
+_priority = contextvars.ContextVar('h51_priority', default='normal')
+
+
+def current_priority():
+    """Return the priority of requests made within the current context"""
+    return _priority.get()
+
+
+@contextlib.contextmanager
+def priority(name):
+    """
+    Set the priority of requests made within the context, e.g:
+
+        with h51.scheduling.priority('low'):
+            assets = h51.resources.Asset.all(client)
+    """
+    token = _priority.set(name)
+    try:
+        yield
+
+    finally:
+        _priority.reset(token)
+
+
+class Scheduler:
+    """
+    A scheduler that shares a client's rate limit between priority classes
+    of requests using weighted fair queueing.
+
+    Requests are granted immediately while the rate limit has requests
+    remaining. Once the remaining requests are exhausted (or `max_in_flight`
+    requests are in flight) requests queue, and as capacity frees up queued
+    requests are granted in proportion to the weights of their priority
+    classes, so low priority (batch) requests cannot starve high priority
+    (interactive) ones.
+    """
+
+    def __init__(self, weights=None, max_in_flight=None):
+
+        # The relative share of the rate limit for each priority class
+        self._weights = weights or {'high': 8, 'normal': 4, 'low': 1}
+
+        # The maximum number of requests that can be in flight at once
+        self._max_in_flight = max_in_flight
+
+        self._condition = threading.Condition()
+
+        # The queue of waiting requests (ordered by virtual finish time) and
+        # the virtual time/last finish time for each class.
+        self._queue = []
+        self._counter = itertools.count()
+        self._virtual_time = 0.0
+        self._finish = {p: 0.0 for p in self._weights}
+
+        # The number of requests granted that have not yet been released
+        self._in_flight = 0
+
+        # The rate limit (as last reported by the API)
+        self._rate_limit = None
+        self._rate_limit_remaining = None
+        self._rate_limit_reset = None
+
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+    @property
+    def queued(self):
+        return len(self._queue)
+
+    def acquire(self, priority='normal'):
+        """Wait until a request with the given priority can be sent"""
+
+        if priority not in self._weights:
+            raise ValueError(f"Unknown priority '{priority}'")
+
+        with self._condition:
+
+            # Tag the request with its virtual finish time
+            tag = max(self._virtual_time, self._finish[priority]) \
+                    + 1 / self._weights[priority]
+            self._finish[priority] = tag
+
+            ticket = (tag, next(self._counter))
+            heapq.heappush(self._queue, ticket)
+
+            while True:
+
+                # Only the request at the head of the queue checks capacity,
+                # the rest wait to be notified.
+                wait = None
+                if self._queue[0] == ticket:
+                    wait = self._wait_time()
+                    if wait == 0:
+                        break
+
+                self._condition.wait(wait)
+
+            heapq.heappop(self._queue)
+            self._virtual_time = tag
+            self._in_flight += 1
+
+            # Let the next request in the queue check for capacity
+            self._condition.notify_all()
+
+    def release(self):
+        """Release a request granted by `acquire` once it has completed"""
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def update(self, rate_limit, rate_limit_remaining, rate_limit_reset):
+        """Update the rate limit from the latest response"""
+        with self._condition:
+            self._rate_limit = rate_limit
+            self._rate_limit_remaining = rate_limit_remaining
+            self._rate_limit_reset = rate_limit_reset
+            self._condition.notify_all()
+
+    def _wait_time(self):
+        """
+        Return 0 if a request can be sent now, otherwise the time to wait
+        before checking again (or `None` to wait until notified).
+        """
+
+        if self._max_in_flight is not None \
+                and self._in_flight >= self._max_in_flight:
+            return None
+
+        if self._rate_limit_remaining is None:
+
+            # Until the rate limit is known send one request at a time
+            return None if self._in_flight > 0 else 0
+
+        remaining = self._rate_limit_remaining
+        if self._rate_limit_reset <= time.time():
+            remaining = self._rate_limit
+
+        if remaining - self._in_flight > 0:
+            return 0
+
+        if self._in_flight > 0:
+            # Wait for a request in flight to report the latest rate limit
+            return None
+
+        return max(0.01, self._rate_limit_reset - time.time())
@@ -16,6 +16,13 @@ class Transform:
         # The arguments for the analyzer
         self._args = {k: v for k, v in kwargs.items() if v is not None}
 
+    def predict(self, geometry):
+        """
+        Return the predicted geometry of an image after the transform has
+        been applied (see `h51.geometry`).
+        """
+        return geometry
+
     def to_json_type(self):
         return [self._name, self._args]
 
@@ -1,5 +1,7 @@
+import math
 
 from . import Transform
+from .. import geometry as _geometry
 
 __all__ = [
     'AutoOrient',
@@ -21,6 +23,24 @@ class AutoOrient(Transform):
     def __init__(self):
         super().__init__('auto_orient')
 
+    def predict(self, geometry):
+        orientation = geometry.orientation
+        width, height = geometry.width, geometry.height
+
+        if orientation in [5, 6, 7, 8]:
+            width, height = height, width
+
+        focal_point = geometry.focal_point
+        if focal_point:
+            focal_point = _geometry.orient_box(focal_point, orientation)
+
+        return geometry.copy(
+            width=width,
+            height=height,
+            orientation=1,
+            focal_point=focal_point
+        )
+
 
 class Crop(Transform):
     """
@@ -36,6 +56,17 @@ class Crop(Transform):
             right=right
         )
 
+    def predict(self, geometry):
+        return _geometry.crop(
+            geometry,
+            (
+                self._args['top'],
+                self._args['left'],
+                self._args['bottom'],
+                self._args['right']
+            )
+        )
+
 
 class Fit(Transform):
     """
@@ -50,6 +81,21 @@ class Fit(Transform):
             resample=resample
         )
 
+    def predict(self, geometry):
+
+        # Images are only ever scaled down to fit
+        ratio = min(
+            self._args['width'] / geometry.width,
+            self._args['height'] / geometry.height,
+            1.0
+        )
+
+        return geometry.copy(
+            width=max(1, round(geometry.width * ratio)),
+            height=max(1, round(geometry.height * ratio)),
+            scale=geometry.scale * ratio
+        )
+
 
 class FocalPointCrop(Transform):
     """
@@ -74,6 +120,47 @@ class FocalPointCrop(Transform):
             padding_right=padding_right
         )
 
+    def predict(self, geometry):
+
+        # Pad the focal point (or entire image if there's no focal point)
+        top, left, bottom, right = geometry.focal_point or (0, 0, 1, 1)
+        top, left, bottom, right = _geometry.clamp_box((
+            top - self._args.get('padding_top', 0),
+            left - self._args.get('padding_left', 0),
+            bottom + self._args.get('padding_bottom', 0),
+            right + self._args.get('padding_right', 0)
+        ))
+
+        aspect_ratio = self._args.get('aspect_ratio')
+        if aspect_ratio:
+
+            # Grow the focal region to the aspect ratio (around its center),
+            # shrinking it if required to fit within the image.
+            width, height = geometry.width, geometry.height
+            center_x = (left + right) / 2 * width
+            center_y = (top + bottom) / 2 * height
+            w = max((right - left) * width, 1)
+            h = max((bottom - top) * height, 1)
+
+            if w / h < aspect_ratio:
+                w = h * aspect_ratio
+            else:
+                h = w / aspect_ratio
+
+            if w > width:
+                w, h = width, width / aspect_ratio
+
+            if h > height:
+                w, h = height * aspect_ratio, height
+
+            x = min(max(center_x - w / 2, 0), width - w)
+            y = min(max(center_y - h / 2, 0), height - h)
+
+            top, left = y / height, x / width
+            bottom, right = (y + h) / height, (x + w) / width
+
+        return _geometry.crop(geometry, (top, left, bottom, right))
+
 
 class Output(Transform):
     """
@@ -97,6 +184,9 @@ class Output(Transform):
             versioned=versioned
         )
 
+    def predict(self, geometry):
+        return geometry.copy(image_format=self._args['image_format'])
+
 
 class Rotate(Transform):
     """
@@ -109,6 +199,41 @@ class Rotate(Transform):
             degrees=degrees
         )
 
+    def predict(self, geometry):
+
+        # Images are rotated counter-clockwise and expanded to fit
+        degrees = self._args['degrees'] % 360
+        width, height = geometry.width, geometry.height
+
+        if degrees % 90 == 0:
+            if degrees in [90, 270]:
+                width, height = height, width
+
+        else:
+            radians = math.radians(degrees)
+            cos, sin = abs(math.cos(radians)), abs(math.sin(radians))
+            width, height = (
+                math.ceil(geometry.width * cos + geometry.height * sin - 1e-6),
+                math.ceil(geometry.width * sin + geometry.height * cos - 1e-6)
+            )
+
+        focal_point = geometry.focal_point
+        if focal_point:
+            focal_point = _geometry.rotate_box(
+                focal_point,
+                degrees,
+                geometry.width,
+                geometry.height,
+                width,
+                height
+            )
+
+        return geometry.copy(
+            width=width,
+            height=height,
+            focal_point=focal_point
+        )
+
 
 class SingleFrame(Transform):
     """
@@ -87,7 +87,11 @@ setup(
     # dependencies). You can install these using the following syntax,
     # for example:
     # $ pip install -e .[dev,test]
-    extras_require={},
+    extras_require={
+        'arrays': ['numpy>=1.16.0', 'Pillow>=6.0.0'],
+        'images': ['Pillow>=6.0.0'],
+        'json': ['orjson>=3.0.0']
+    },
 
     # If there are data files included in your packages that need to be
     # installed, specify them here.  If using Python 2.6 or less, then these
@@ -103,5 +107,7 @@ setup(
     # To provide executable scripts, use entry points in preference to the
     # "scripts" keyword. Entry points provide cross-platform support and allow
     # pip to create the appropriate form of executable for the target platform.
-    entry_points={}
+    entry_points={
+        'console_scripts': ['h51=h51.cli:main']
+    }
 )